@@ -1,6 +1,6 @@
 from datetime import timedelta
+from typing import NamedTuple
 from sqladmin import Admin
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 
 from fastapi import FastAPI
 from app.core.config import settings
@@ -8,9 +8,28 @@ from app.models import User
 from sqladmin import ModelView
 from sqladmin.authentication import AuthenticationBackend
 from fastapi import Request
+from app.core.cache import TTLCache
 from app.core.db import sessionmanager
-from app.crud import authenticate, get_current_user
-from app.core.security import create_access_token, get_password_hash
+from app.core.ratelimit import allow_login_attempt
+from app.crud import authenticate, get_current_user, missing_username_cache
+from app.core.security import create_access_token, get_password_hash_async, validate_token
+from app.user_cache import user_cache
+
+
+class AdminSession(NamedTuple):
+    user_id: int
+    is_superuser: bool
+
+
+# Validated admin session tokens, so page loads don't each query the user row
+admin_session_cache: TTLCache[str, AdminSession] = TTLCache(
+    max_size=settings.ADMIN_SESSION_CACHE_MAX_SIZE,
+    ttl=settings.ADMIN_SESSION_CACHE_TTL_SECONDS,
+)
+
+
+def invalidate_admin_sessions(user_id: int) -> None:
+    admin_session_cache.discard_where(lambda admin_session: admin_session.user_id == user_id)
 
 
 class AdminAuth(AuthenticationBackend):
@@ -26,13 +45,16 @@ class AdminAuth(AuthenticationBackend):
             password: str = password_field
             if not username or not password:
                 return False
+            client_ip = request.client.host if request.client else None
+            if not await allow_login_attempt(username, client_ip):
+                return False
             authenticated_user = await authenticate(
                 session=session, username=username, password=password
             )
             if not authenticated_user or not authenticated_user.is_superuser:
                 return False
             access_token_expires = timedelta(
-                minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
+                minutes=settings.ADMIN_SESSION_EXPIRE_MINUTES
             )
             access_token = create_access_token(
                 authenticated_user.id, expires_delta=access_token_expires
@@ -51,11 +73,21 @@ class AdminAuth(AuthenticationBackend):
         if not token:
             return False
 
-        async with sessionmanager.session() as session:
-            current_user = await get_current_user(session, token)
-            if not current_user or not current_user.is_superuser:
-                return False
-            return True
+        # Expiry and signature are still checked on every request
+        if not await validate_token(token):
+            admin_session_cache.discard(token)
+            return False
+
+        admin_session = admin_session_cache.get(token)
+        if admin_session is None:
+            async with sessionmanager.session(readonly=True) as session:
+                current_user = await get_current_user(session, token)
+                if not current_user:
+                    return False
+                admin_session = AdminSession(current_user.id, current_user.is_superuser)
+            admin_session_cache.set(token, admin_session)
+
+        return admin_session.is_superuser
 
 
 class UserAdmin(ModelView, model=User):
@@ -80,24 +112,26 @@ class UserAdmin(ModelView, model=User):
 
     async def on_model_change(self, data, model, is_created, request) -> None:
         if is_created:
-            data["hashed_password"] = get_password_hash(data["hashed_password"])
+            data["hashed_password"] = await get_password_hash_async(data["hashed_password"])
 
+    async def after_model_change(self, data, model, is_created, request) -> None:
+        # Created and renamed users alike may have been remembered as missing
+        missing_username_cache.discard(model.username.lower())
+        if not is_created:
+            invalidate_admin_sessions(model.id)
+        await user_cache.invalidate(model.id, model.username)
 
-def get_admin(app: FastAPI):
-    async_engine = create_async_engine(
-        str(settings.SQLALCHEMY_DATABASE_URI),
-        echo=settings.ECHO_SQL,
-    )
-    # Create an async sessionmaker
-    AsyncSessionLocal = async_sessionmaker(
-        bind=async_engine,
-        expire_on_commit=False,  # often helpful in async contexts
-    )
+    async def after_model_delete(self, model, request) -> None:
+        invalidate_admin_sessions(model.id)
+        await user_cache.invalidate(model.id, model.username)
 
+
+def get_admin(app: FastAPI):
+    # Reuse the application's sessionmaker rather than opening a second pool; it is
+    # bound to the engine when that starts, so building the admin doesn't connect
     admin = Admin(
         app,
-        engine=async_engine,
-        session_maker=AsyncSessionLocal,
+        session_maker=sessionmanager.sessionmaker,
         authentication_backend=AdminAuth(secret_key=settings.SECRET_KEY),
     )
 
@@ -0,0 +1,24 @@
+"""The admin as its own ASGI app, for running it apart from the API workers.
+
+    ADMIN_MODE=standalone uv run uvicorn app.main:app --port 8000
+    uv run uvicorn app.admin_app:app --port 8001
+
+The admin still lives under ``/admin``, so a proxy can route that prefix to this
+process unchanged. It has its own connection pool and password hash workers,
+so admin traffic can't take them from the API.
+"""
+
+from fastapi import FastAPI
+
+from app.admin import get_admin
+from app.core.config import settings
+from app.core.tracing import init_sentry
+from app.lifespan import lifespan
+
+app = FastAPI(title=f"{settings.PROJECT_NAME} admin", lifespan=lifespan, openapi_url=None)
+
+get_admin(app)
+
+
+if settings.SENTRY_DSN and settings.ENVIRONMENT != "local":
+    init_sentry()
@@ -0,0 +1,72 @@
+"""add case-insensitive user indexes
+
+Revision ID: 5d2e9f4c1b83
+Revises: c8e4b51a7f20
+Create Date: 2026-10-18 18:03:52.730441
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5d2e9f4c1b83"
+down_revision: Union[str, Sequence[str], None] = "c8e4b51a7f20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _check_no_case_duplicates(column: str) -> None:
+    # A failed concurrent unique build leaves an invalid index behind, so
+    # report accounts that only differ by case up front
+    duplicates = (
+        op.get_bind()
+        .execute(
+            sa.text(
+                f"SELECT lower({column}) FROM app_user GROUP BY 1 HAVING count(*) > 1 LIMIT 10"
+            )
+        )
+        .scalars()
+        .all()
+    )
+    if duplicates:
+        raise RuntimeError(
+            f"app_user.{column} values differ only by case for {', '.join(duplicates)}; "
+            "rename or merge these accounts before upgrading"
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _check_no_case_duplicates("username")
+    _check_no_case_duplicates("email")
+    # Built concurrently so the table stays writable on large deployments
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_app_user_username_lower",
+            "app_user",
+            [sa.text("lower(username)")],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_app_user_email_lower",
+            "app_user",
+            [sa.text("lower(email)")],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_app_user_email_lower", table_name="app_user", postgresql_concurrently=True
+        )
+        op.drop_index(
+            "ix_app_user_username_lower", table_name="app_user", postgresql_concurrently=True
+        )
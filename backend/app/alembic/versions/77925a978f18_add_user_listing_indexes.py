@@ -0,0 +1,50 @@
+"""add user listing indexes
+
+Revision ID: 77925a978f18
+Revises: ebeb4089a490
+Create Date: 2026-10-18 10:12:41.118305
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "77925a978f18"
+down_revision: Union[str, Sequence[str], None] = "ebeb4089a490"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built concurrently so the table stays writable on large deployments
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_app_user_username_pattern",
+            "app_user",
+            [sa.text("lower(username) text_pattern_ops")],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_app_user_email_pattern",
+            "app_user",
+            [sa.text("lower(email) text_pattern_ops")],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_app_user_email_pattern", table_name="app_user", postgresql_concurrently=True
+        )
+        op.drop_index(
+            "ix_app_user_username_pattern", table_name="app_user", postgresql_concurrently=True
+        )
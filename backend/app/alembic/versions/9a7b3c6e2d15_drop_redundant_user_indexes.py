@@ -0,0 +1,58 @@
+"""drop redundant user indexes
+
+Revision ID: 9a7b3c6e2d15
+Revises: 5d2e9f4c1b83
+Create Date: 2026-10-18 19:41:08.256930
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9a7b3c6e2d15"
+down_revision: Union[str, Sequence[str], None] = "5d2e9f4c1b83"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Dropped concurrently so writes aren't blocked behind the table lock
+    with op.get_context().autocommit_block():
+        # Same key as app_user_pkey
+        op.drop_index("ix_app_user_id", table_name="app_user", postgresql_concurrently=True)
+        # Uniqueness is enforced by the stricter lower() indexes, which with the
+        # lower() text_pattern_ops indexes serve every lookup
+        op.drop_index(
+            "ix_app_user_username", table_name="app_user", postgresql_concurrently=True
+        )
+        op.drop_index("ix_app_user_email", table_name="app_user", postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_app_user_email",
+            "app_user",
+            ["email"],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_app_user_username",
+            "app_user",
+            ["username"],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_app_user_id",
+            "app_user",
+            ["id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,45 @@
+"""add user search trigram index
+
+Revision ID: c8e4b51a7f20
+Revises: 3f1c2a7d9b64
+Create Date: 2026-10-18 16:20:37.514093
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c8e4b51a7f20"
+down_revision: Union[str, Sequence[str], None] = "3f1c2a7d9b64"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_COLUMNS = ["username", "email", "first_name", "last_name"]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The extension is left in place on downgrade; other objects may rely on it
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Built concurrently so the table stays writable on large deployments
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_app_user_search_trgm",
+            "app_user",
+            SEARCH_COLUMNS,
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops" for column in SEARCH_COLUMNS},
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_app_user_search_trgm", table_name="app_user", postgresql_concurrently=True
+        )
@@ -0,0 +1,57 @@
+from collections.abc import AsyncIterator
+from typing import Annotated
+
+from fastapi import Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.db import sessionmanager
+from app.core.security import InvalidTokenError, decode_token
+from app.schemas.token import TokenUser
+
+reusable_oauth2 = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/login/access-token")
+
+
+async def get_db() -> AsyncIterator[AsyncSession]:
+    async with sessionmanager.session() as session:
+        yield session
+
+
+async def get_readonly_db() -> AsyncIterator[AsyncSession]:
+    async with sessionmanager.session(readonly=True) as session:
+        yield session
+
+
+SessionDep = Annotated[AsyncSession, Depends(get_db)]
+ReadOnlySessionDep = Annotated[AsyncSession, Depends(get_readonly_db)]
+TokenDep = Annotated[str, Depends(reusable_oauth2)]
+
+
+async def get_token_user(token: TokenDep) -> TokenUser:
+    """Identify the caller from their access token alone, without a database read."""
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    try:
+        payload = decode_token(token)
+    except InvalidTokenError:
+        raise credentials_exception
+    # Tokens issued before refresh tokens carry no role and must be replaced
+    if "su" not in payload or not payload["sub"].isdigit():
+        raise credentials_exception
+    return TokenUser(id=int(payload["sub"]), is_superuser=payload["su"])
+
+
+TokenUserDep = Annotated[TokenUser, Depends(get_token_user)]
+
+
+async def get_current_active_superuser(current_user: TokenUserDep) -> TokenUser:
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="The user doesn't have enough privileges",
+        )
+    return current_user
@@ -0,0 +1,68 @@
+from datetime import timedelta
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.security import OAuth2PasswordRequestForm
+
+from app import crud
+from app.api.deps import SessionDep
+from app.core.config import settings
+from app.core.ratelimit import allow_login_attempt
+from app.core.security import create_access_token
+from app.models import User
+from app.schemas.token import RefreshTokenRequest, Token
+
+router = APIRouter(tags=["login"])
+
+
+def issue_tokens(user: User, refresh_token: str) -> Token:
+    expires_delta = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    # The role rides in the token so requests can be authorized without a lookup
+    access_token = create_access_token(
+        user.id, expires_delta=expires_delta, claims={"su": user.is_superuser}
+    )
+    return Token(
+        access_token=access_token,
+        expires_in=int(expires_delta.total_seconds()),
+        refresh_token=refresh_token,
+    )
+
+
+@router.post("/login/access-token")
+async def login_access_token(
+    request: Request,
+    session: SessionDep,
+    form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
+) -> Token:
+    """OAuth2 password login, returning a short-lived access token and a refresh token."""
+    client_ip = request.client.host if request.client else None
+    if not await allow_login_attempt(form_data.username, client_ip):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts, try again later",
+        )
+    user = await crud.authenticate(
+        session=session, username=form_data.username, password=form_data.password
+    )
+    if not user:
+        raise HTTPException(status_code=400, detail="Incorrect username or password")
+    refresh_token = await crud.create_refresh_token(session=session, user_id=user.id)
+    return issue_tokens(user, refresh_token)
+
+
+@router.post("/login/refresh")
+async def refresh_access_token(session: SessionDep, body: RefreshTokenRequest) -> Token:
+    """Exchange a refresh token for new tokens; each refresh token works once."""
+    rotated = await crud.rotate_refresh_token(session=session, token=body.refresh_token)
+    if rotated is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token"
+        )
+    user, refresh_token = rotated
+    return issue_tokens(user, refresh_token)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(session: SessionDep, body: RefreshTokenRequest) -> None:
+    """Revoke the refresh token and every token rotated from the same login."""
+    await crud.revoke_refresh_token(session=session, token=body.refresh_token)
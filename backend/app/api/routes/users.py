@@ -0,0 +1,107 @@
+import csv
+import io
+from collections.abc import AsyncIterator
+from enum import StrEnum
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud
+from app.api.deps import ReadOnlySessionDep, get_current_active_superuser
+from app.models import User
+from app.schemas.user import UserOut, UsersPage
+
+router = APIRouter(prefix="/users", tags=["users"])
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_BATCH_SIZE = 1000
+
+
+class ExportFormat(StrEnum):
+    csv = "csv"
+    ndjson = "ndjson"
+
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.csv: "text/csv",
+    ExportFormat.ndjson: "application/x-ndjson",
+}
+
+
+@router.get("", dependencies=[Depends(get_current_active_superuser)])
+async def list_users(
+    session: ReadOnlySessionDep,
+    after: int | None = None,
+    limit: int = Query(default=50, ge=1, le=500),
+    username_prefix: str | None = None,
+    email_prefix: str | None = None,
+) -> UsersPage:
+    """List users by id with keyset pagination; pass ``next_cursor`` as ``after``."""
+    # One extra row tells us whether another page exists
+    rows = await crud.list_users(
+        session=session,
+        after=after,
+        limit=limit + 1,
+        username_prefix=username_prefix,
+        email_prefix=email_prefix,
+    )
+    users = [UserOut.model_validate(row, from_attributes=True) for row in rows[:limit]]
+    return UsersPage(
+        data=users,
+        next_cursor=users[-1].id if len(rows) > limit else None,
+    )
+
+
+@router.get("/search", dependencies=[Depends(get_current_active_superuser)])
+async def search_users(
+    session: ReadOnlySessionDep,
+    q: str = Query(min_length=1, max_length=100),
+    limit: int = Query(default=20, ge=1, le=100),
+) -> list[UserOut]:
+    """Find users by username, email or name prefix, or a similar word, best match first."""
+    rows = await crud.search_users(session=session, query=q, limit=limit)
+    return [UserOut.model_validate(row, from_attributes=True) for row in rows]
+
+
+async def stream_users(session: AsyncSession, format: ExportFormat) -> AsyncIterator[str]:
+    fields = list(UserOut.model_fields)
+    statement = (
+        select(*(getattr(User, name) for name in fields))
+        .order_by(User.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if format == ExportFormat.csv:
+        writer.writerow(fields)
+
+    result = await session.stream(statement)
+    async for rows in result.partitions():
+        for row in rows:
+            if format == ExportFormat.csv:
+                writer.writerow(row)
+            else:
+                # Rows come straight from the table, so skip re-validating them
+                buffer.write(UserOut.model_construct(**row._mapping).model_dump_json())
+                buffer.write("\n")
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+@router.get("/export", dependencies=[Depends(get_current_active_superuser)])
+async def export_users(
+    session: ReadOnlySessionDep, format: ExportFormat = ExportFormat.csv
+) -> StreamingResponse:
+    """Stream every user as CSV or NDJSON without loading the table into memory."""
+    return StreamingResponse(
+        stream_users(session, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="users.{format}"'},
+    )
+
@@ -0,0 +1,27 @@
+"""Pick a bcrypt cost for this machine and print the setting to deploy.
+
+    uv run python -m app.calibrate_password_hashing --target-ms 250
+
+Run it once on the hardware the API runs on and set the printed
+PASSWORD_HASH_ROUNDS for every worker. Workers then agree on one cost, and
+hashes below it are upgraded as users log in.
+"""
+
+import argparse
+
+from app.core.security import BCRYPT_MAX_ROUNDS, BCRYPT_MIN_ROUNDS, calibrate_bcrypt_rounds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Calibrate the bcrypt cost.")
+    parser.add_argument("--target-ms", type=float, default=250, help="time per hash to aim for")
+    parser.add_argument("--min-rounds", type=int, default=BCRYPT_MIN_ROUNDS)
+    parser.add_argument("--max-rounds", type=int, default=BCRYPT_MAX_ROUNDS)
+    args = parser.parse_args()
+
+    rounds = calibrate_bcrypt_rounds(args.target_ms, args.min_rounds, args.max_rounds)
+    print(f"PASSWORD_HASH_ROUNDS={rounds}")
+
+
+if __name__ == "__main__":
+    main()
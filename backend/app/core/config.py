@@ -6,12 +6,13 @@ from pydantic import (
     AnyUrl,
     BeforeValidator,
     EmailStr,
+    Field,
     HttpUrl,
     PostgresDsn,
     computed_field,
     model_validator,
 )
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
 from typing_extensions import Self
 
 
@@ -23,6 +24,14 @@ def parse_cors(v: Any) -> list[str] | str:
     raise ValueError(v)
 
 
+def parse_comma_list(v: Any) -> list[str]:
+    if isinstance(v, str):
+        return [i.strip() for i in v.split(",") if i.strip()]
+    elif isinstance(v, list):
+        return v
+    raise ValueError(v)
+
+
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -31,8 +40,39 @@ class Settings(BaseSettings):
     )
     API_V1_STR: str = "/api/v1"
     SECRET_KEY: str = secrets.token_urlsafe(32)
-    # 60 minutes * 24 hours * 8 days = 8 days
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8
+    # Access tokens are trusted without a database read until they expire, so
+    # this bounds how long a revoked or demoted user keeps access
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
+    # 60 minutes * 24 hours * 30 days = 30 days
+    REFRESH_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 30
+    # 60 minutes * 24 hours * 8 days = 8 days; admin sessions are checked against
+    # the user on every request, so they can stay long-lived
+    ADMIN_SESSION_EXPIRE_MINUTES: int = 60 * 24 * 8
+    TOKEN_CACHE_MAX_SIZE: int = 10_000
+    # bcrypt runs on a dedicated pool so logins don't block the event loop
+    PASSWORD_HASH_EXECUTOR: Literal["thread", "process"] = "thread"
+    PASSWORD_HASH_MAX_WORKERS: int = 4
+    # Hashes below this cost are upgraded on login; pick it for the deployment
+    # hardware with `python -m app.calibrate_password_hashing`
+    PASSWORD_HASH_ROUNDS: int = 12
+    # Token buckets on login attempts, refilled per minute up to the burst size;
+    # the username buckets are per username and client IP
+    LOGIN_RATE_LIMIT_PER_MINUTE: float = 10
+    LOGIN_RATE_LIMIT_BURST: int = 5
+    LOGIN_IP_RATE_LIMIT_PER_MINUTE: float = 60
+    LOGIN_IP_RATE_LIMIT_BURST: int = 20
+    # How long a username that doesn't exist is remembered by failed logins
+    LOGIN_NEGATIVE_CACHE_TTL_SECONDS: int = 60
+    LOGIN_NEGATIVE_CACHE_MAX_SIZE: int = 100_000
+    ADMIN_SESSION_CACHE_TTL_SECONDS: int = 60
+    ADMIN_SESSION_CACHE_MAX_SIZE: int = 1024
+    # Cached user rows for token and login lookups. "redis" shares one cache
+    # between workers and the standalone admin, so edits invalidate everywhere;
+    # with "memory" other processes may serve a stale row for up to the TTL
+    USER_CACHE_BACKEND: Literal["memory", "redis", "disabled"] = "memory"
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_SIZE: int = 10_000
+    REDIS_URL: str | None = None
     FRONTEND_HOST: str = "http://localhost:5173"
     ENVIRONMENT: Literal["local", "staging", "production"] = "local"
 
@@ -48,13 +88,45 @@ class Settings(BaseSettings):
         ]
 
     PROJECT_NAME: str
+    # "mounted" serves the admin from the API app; "standalone" leaves it to
+    # app.admin_app in its own process; "disabled" serves no admin at all
+    ADMIN_MODE: Literal["mounted", "standalone", "disabled"] = "mounted"
     SENTRY_DSN: HttpUrl | None = None
+    SENTRY_TRACES_SAMPLE_RATE: float = Field(default=0.1, ge=0, le=1)
+    # Relative to traced transactions
+    SENTRY_PROFILES_SAMPLE_RATE: float = Field(default=0.0, ge=0, le=1)
+    # Opt-in: always send slower or failed transactions. Every request is then
+    # traced in process and sampled on send; None keeps plain head sampling
+    SENTRY_SLOW_TRANSACTION_MS: float | None = None
+    # Serve Prometheus metrics at /metrics; keep it off the public network
+    METRICS_ENABLED: bool = True
     POSTGRES_SERVER: str
     POSTGRES_PORT: int = 5432
     POSTGRES_USER: str
     POSTGRES_PASSWORD: str = ""
     POSTGRES_DB: str = ""
     ECHO_SQL: bool = False
+    # Per worker process; total connections = workers * (pool size + overflow)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    # Recycle before server/proxy idle timeouts silently drop connections
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Prepared statements cached per connection, by both SQLAlchemy's asyncpg
+    # adapter and asyncpg itself; 0 disables both (e.g. for pgbouncer)
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    # Connections opened and primed at startup, capped at DB_POOL_SIZE
+    DB_POOL_WARMUP_CONNECTIONS: int = 5
+    # Read replicas as "host" or "host:port", sharing the primary's credentials and db
+    POSTGRES_REPLICA_SERVERS: Annotated[
+        list[str], NoDecode, BeforeValidator(parse_comma_list)
+    ] = []
+    DB_REPLICA_RETRY_SECONDS: float = 30.0
+    # Requests running more queries than this are logged; raised on instead if
+    # SQL_QUERY_BUDGET_RAISE (meant for tests and local development)
+    SQL_QUERY_BUDGET: int | None = None
+    SQL_QUERY_BUDGET_RAISE: bool = False
 
     @computed_field  # type: ignore[prop-decorator]
     @property
@@ -68,6 +140,24 @@ class Settings(BaseSettings):
             path=self.POSTGRES_DB,
         )
 
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def SQLALCHEMY_REPLICA_URIS(self) -> list[PostgresDsn]:
+        uris = []
+        for server in self.POSTGRES_REPLICA_SERVERS:
+            host, _, port = server.partition(":")
+            uris.append(
+                PostgresDsn.build(
+                    scheme="postgresql+asyncpg",
+                    username=self.POSTGRES_USER,
+                    password=self.POSTGRES_PASSWORD,
+                    host=host,
+                    port=int(port) if port else self.POSTGRES_PORT,
+                    path=self.POSTGRES_DB,
+                )
+            )
+        return uris
+
     SMTP_TLS: bool = True
     SMTP_SSL: bool = False
     SMTP_PORT: int = 587
@@ -105,6 +195,12 @@ class Settings(BaseSettings):
             else:
                 raise ValueError(message)
 
+    @model_validator(mode="after")
+    def _check_user_cache_backend(self) -> Self:
+        if self.USER_CACHE_BACKEND == "redis" and not self.REDIS_URL:
+            raise ValueError('USER_CACHE_BACKEND "redis" needs REDIS_URL to be set')
+        return self
+
     @model_validator(mode="after")
     def _enforce_non_default_secrets(self) -> Self:
         self._check_default_secret("SECRET_KEY", self.SECRET_KEY)
@@ -1,41 +1,238 @@
+import asyncio
 import contextlib
+import itertools
+import logging
+import time
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass
 from typing import Any, AsyncIterator
 
 from app.core.config import settings
+from app.core.metrics import Histogram, HistogramSnapshot, Sample, registry
+from app.core.querystats import instrument_engine
+from app.core.tracing import span
 from sqlalchemy.ext.asyncio import (
     AsyncConnection,
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry, QueuePool
+
+logger = logging.getLogger(__name__)
 
 
 class Base(DeclarativeBase):
     __mapper_args__ = {"eager_defaults": True}
 
 
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waits for a connection."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.checkout_wait = Histogram()
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        start = time.perf_counter()
+        try:
+            with span("db.pool.checkout"):
+                return super()._do_get()
+        finally:
+            self.checkout_wait.observe(time.perf_counter() - start)
+
+
+@dataclass(frozen=True)
+class PoolStats:
+    size: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    checkout_wait: HistogramSnapshot | None
+
+
+@dataclass
+class Replica:
+    engine: AsyncEngine
+    # monotonic time before which the replica is skipped after a failed connect;
+    # only connect errors set it, not failed queries or replication lag
+    unhealthy_until: float = 0.0
+
+
+def session_engine(session: AsyncSession) -> AsyncEngine:
+    """The engine ``session`` is bound to, directly or through one of its connections."""
+    bind = session.bind
+    engine = bind.engine if isinstance(bind, AsyncConnection) else bind
+    if not isinstance(engine, AsyncEngine):
+        raise TypeError("session must be bound to an AsyncEngine or AsyncConnection")
+    return engine
+
+
 class DatabaseSessionManager:
-    def __init__(self, host: str, engine_kwargs: dict[str, Any] = {}):
-        self._engine = create_async_engine(host, **engine_kwargs)
-        self._sessionmaker = async_sessionmaker(
-            autocommit=False, bind=self._engine, expire_on_commit=False
+    """Owns the primary and replica engines, created on first use.
+
+    Nothing connects or even loads the database driver until a session, connection
+    or engine is asked for, so importing the app stays cheap. ``sessionmaker`` is
+    available up front and bound to the engine once it starts.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        engine_kwargs: dict[str, Any] = {},
+        replica_hosts: Sequence[str] = (),
+        replica_retry_seconds: float = 30.0,
+    ):
+        self._host = host
+        self._engine_kwargs = {"poolclass": InstrumentedAsyncQueuePool, **engine_kwargs}
+        self._replica_hosts = list(replica_hosts)
+        self._engine: AsyncEngine | None = None
+        self._sessionmaker = async_sessionmaker(autocommit=False, expire_on_commit=False)
+        self._replicas: list[Replica] = []
+        self._replica_cursor = itertools.count()
+        self._replica_retry_seconds = replica_retry_seconds
+
+    def _start(self) -> AsyncEngine:
+        if self._engine is None:
+            self._engine = create_async_engine(self._host, **self._engine_kwargs)
+            self._sessionmaker.configure(bind=self._engine)
+            self._replicas = [
+                Replica(create_async_engine(replica_host, **self._engine_kwargs))
+                for replica_host in self._replica_hosts
+            ]
+            for engine in (self._engine, *(replica.engine for replica in self._replicas)):
+                instrument_engine(engine)
+        return self._engine
+
+    @property
+    def started(self) -> bool:
+        return self._engine is not None
+
+    @property
+    def engine(self) -> AsyncEngine:
+        return self._start()
+
+    @property
+    def replica_engines(self) -> list[AsyncEngine]:
+        self._start()
+        return [replica.engine for replica in self._replicas]
+
+    @property
+    def sessionmaker(self) -> async_sessionmaker[AsyncSession]:
+        return self._sessionmaker
+
+    def pool_stats(self) -> PoolStats | None:
+        if self._engine is None:
+            return None
+        return self._pool_stats(self._engine)
+
+    def replica_pool_stats(self) -> list[PoolStats | None]:
+        return [self._pool_stats(replica.engine) for replica in self._replicas]
+
+    def labelled_pool_stats(self) -> list[tuple[str, PoolStats]]:
+        """Stats for every queue pool, labelled ``primary`` or ``replica-<n>``."""
+        labelled = [("primary", self.pool_stats())]
+        labelled += [
+            (f"replica-{i}", stats) for i, stats in enumerate(self.replica_pool_stats())
+        ]
+        return [(pool, stats) for pool, stats in labelled if stats is not None]
+
+    @staticmethod
+    def _pool_stats(engine: AsyncEngine) -> PoolStats | None:
+        pool = engine.pool
+        if not isinstance(pool, QueuePool):
+            return None
+        return PoolStats(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+            checkout_wait=(
+                pool.checkout_wait.snapshot()
+                if isinstance(pool, InstrumentedAsyncQueuePool)
+                else None
+            ),
+        )
+
+    async def warmup(
+        self,
+        connections: int,
+        prime: Callable[[AsyncSession], Awaitable[None]] | None = None,
+    ) -> int:
+        """Open up to ``connections`` pooled connections per engine ahead of traffic.
+
+        ``prime`` runs on each connection so asyncpg prepares its statements and
+        introspects types before the first real request. Failures are logged
+        rather than raised; connections are then opened lazily as usual.
+        """
+        engines = [self.engine, *(replica.engine for replica in self._replicas)]
+        warmed = await asyncio.gather(
+            *(self._warmup_engine(engine, connections, prime) for engine in engines)
+        )
+        return sum(warmed)
+
+    async def _warmup_engine(
+        self,
+        engine: AsyncEngine,
+        connections: int,
+        prime: Callable[[AsyncSession], Awaitable[None]] | None,
+    ) -> int:
+        pool = engine.pool
+        if isinstance(pool, QueuePool):
+            connections = min(connections, pool.size())
+        if connections <= 0:
+            return 0
+
+        results = await asyncio.gather(
+            *(self._open_warm_connection(engine, prime) for _ in range(connections)),
+            return_exceptions=True,
         )
+        errors = [result for result in results if isinstance(result, BaseException)]
+        for result in results:
+            if not isinstance(result, BaseException):
+                await result.close()
+        if errors:
+            logger.warning(
+                "Database pool warmup failed for %d of %d connections to %s: %r",
+                len(errors),
+                connections,
+                engine.url.render_as_string(hide_password=True),
+                errors[0],
+            )
+        return connections - len(errors)
+
+    async def _open_warm_connection(
+        self,
+        engine: AsyncEngine,
+        prime: Callable[[AsyncSession], Awaitable[None]] | None,
+    ) -> AsyncConnection:
+        connection = await engine.connect()
+        try:
+            if prime is not None:
+                async with AsyncSession(bind=connection) as session:
+                    await prime(session)
+        except BaseException:
+            await connection.close()
+            raise
+        return connection
 
     async def close(self):
+        """Dispose of every pool; the next use starts fresh engines."""
         if self._engine is None:
-            raise Exception("DatabaseSessionManager is not initialized")
+            return
         await self._engine.dispose()
+        for replica in self._replicas:
+            await replica.engine.dispose()
 
         self._engine = None
-        self._sessionmaker = None
+        self._replicas = []
 
     @contextlib.asynccontextmanager
     async def connect(self) -> AsyncIterator[AsyncConnection]:
-        if self._engine is None:
-            raise Exception("DatabaseSessionManager is not initialized")
-
-        async with self._engine.begin() as connection:
+        async with self.engine.begin() as connection:
             try:
                 yield connection
             except Exception:
@@ -43,11 +240,21 @@ class DatabaseSessionManager:
                 raise
 
     @contextlib.asynccontextmanager
-    async def session(self) -> AsyncIterator[AsyncSession]:
-        if self._sessionmaker is None:
-            raise Exception("DatabaseSessionManager is not initialized")
+    async def session(self, readonly: bool = False) -> AsyncIterator[AsyncSession]:
+        """Yield a session on the primary, or on a replica when ``readonly``.
 
-        session = self._sessionmaker()
+        Read-only sessions fall back to the primary when no replica is configured
+        or every replica is currently failing to connect. Failover only reacts to
+        connect errors: a replica that accepts connections but fails queries, or
+        lags behind the primary, keeps being used, and its query errors reach
+        the caller.
+        """
+        self._start()
+        replica_connection = await self._connect_replica() if readonly else None
+        if replica_connection is not None:
+            session = self._sessionmaker(bind=replica_connection)
+        else:
+            session = self._sessionmaker()
         try:
             yield session
         except Exception:
@@ -55,8 +262,81 @@ class DatabaseSessionManager:
             raise
         finally:
             await session.close()
+            if replica_connection is not None:
+                await replica_connection.close()
+
+    async def _connect_replica(self) -> AsyncConnection | None:
+        if not self._replicas:
+            return None
+
+        start = next(self._replica_cursor)
+        for offset in range(len(self._replicas)):
+            replica = self._replicas[(start + offset) % len(self._replicas)]
+            if replica.unhealthy_until > time.monotonic():
+                continue
+            try:
+                return await replica.engine.connect()
+            except (OSError, asyncio.TimeoutError, DBAPIError) as e:
+                replica.unhealthy_until = time.monotonic() + self._replica_retry_seconds
+                logger.warning(
+                    "Read replica %s unavailable, skipping for %ss: %r",
+                    replica.engine.url.render_as_string(hide_password=True),
+                    self._replica_retry_seconds,
+                    e,
+                )
+        return None
 
 
+# The only engine in the process: API, admin and scripts all share its pool
 sessionmanager = DatabaseSessionManager(
-    str(settings.SQLALCHEMY_DATABASE_URI), {"echo": settings.ECHO_SQL}
+    str(settings.SQLALCHEMY_DATABASE_URI),
+    {
+        "echo": settings.ECHO_SQL,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": {
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        },
+    },
+    replica_hosts=[str(uri) for uri in settings.SQLALCHEMY_REPLICA_URIS],
+    replica_retry_seconds=settings.DB_REPLICA_RETRY_SECONDS,
+)
+
+
+def _collect_pool_connections() -> list[Sample]:
+    samples: list[Sample] = []
+    for pool, stats in sessionmanager.labelled_pool_stats():
+        samples += [
+            ({"pool": pool, "state": "checked_in"}, stats.checked_in),
+            ({"pool": pool, "state": "checked_out"}, stats.checked_out),
+            ({"pool": pool, "state": "overflow"}, stats.overflow),
+        ]
+    return samples
+
+
+registry.register(
+    "app_db_pool_size",
+    "Configured connections per database pool.",
+    "gauge",
+    lambda: [({"pool": pool}, stats.size) for pool, stats in sessionmanager.labelled_pool_stats()],
+)
+registry.register(
+    "app_db_pool_connections",
+    "Database pool connections by state.",
+    "gauge",
+    _collect_pool_connections,
+)
+registry.register(
+    "app_db_pool_checkout_wait_seconds",
+    "Time spent waiting to check a connection out of the pool.",
+    "histogram",
+    lambda: [
+        ({"pool": pool}, stats.checkout_wait)
+        for pool, stats in sessionmanager.labelled_pool_stats()
+        if stats.checkout_wait is not None
+    ],
 )
@@ -0,0 +1,97 @@
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Literal, TypeVar
+
+T = TypeVar("T")
+
+ExecutorKind = Literal["thread", "process"]
+
+
+@dataclass(frozen=True)
+class ExecutorStats:
+    max_workers: int
+    in_flight: int
+    queue_depth: int
+    peak_queue_depth: int
+    submitted: int
+    completed: int
+
+
+class BoundedExecutor:
+    """Runs blocking calls off the event loop on a fixed-size worker pool.
+
+    At most ``max_workers`` calls run at once; anything beyond that waits in the
+    pool queue and is reported as ``queue_depth``. The underlying pool is only
+    created on first use.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        kind: ExecutorKind = "thread",
+        name: str = "worker",
+        initializer: Callable[..., Any] | None = None,
+        initargs: tuple[Any, ...] = (),
+    ):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.max_workers = max_workers
+        self.kind = kind
+        self.name = name
+        self._initializer = initializer
+        self._initargs = initargs
+        self._executor: Executor | None = None
+        self._in_flight = 0
+        self._peak_queue_depth = 0
+        self._submitted = 0
+        self._completed = 0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    initializer=self._initializer,
+                    initargs=self._initargs,
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix=self.name,
+                    initializer=self._initializer,
+                    initargs=self._initargs,
+                )
+        return self._executor
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        self._submitted += 1
+        self._in_flight += 1
+        self._peak_queue_depth = max(self._peak_queue_depth, self.queue_depth)
+        try:
+            return await loop.run_in_executor(executor, fn, *args)
+        finally:
+            self._in_flight -= 1
+            self._completed += 1
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self._in_flight - self.max_workers)
+
+    def stats(self) -> ExecutorStats:
+        return ExecutorStats(
+            max_workers=self.max_workers,
+            in_flight=self._in_flight,
+            queue_depth=self.queue_depth,
+            peak_queue_depth=self._peak_queue_depth,
+            submitted=self._submitted,
+            completed=self._completed,
+        )
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
@@ -0,0 +1,88 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable, Mapping, Sequence
+from typing import Generic, TypeVar
+
+from app.core.querystats import QueryStats, current_query_stats, track_queries
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class BatchLoader(Generic[K, V]):
+    """Coalesces loads into batches and shares in-flight loads.
+
+    Keys requested during the same event-loop iteration go to ``batch_fn`` in one
+    call (split into chunks of ``max_batch_size``). A key already being loaded
+    joins that load instead of starting another. Nothing is cached once a batch
+    completes. Bound to the event loop it is first used on.
+
+    Batches run in tasks of their own, so queries they make are tracked apart
+    from any caller's ``track_queries`` block and then added to the stats of
+    every caller waiting on the batch.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[Sequence[K]], Awaitable[Mapping[K, V]]],
+        max_batch_size: int = 500,
+    ):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self._queued: dict[K, asyncio.Future[V | None]] = {}
+        self._in_flight: dict[K, asyncio.Future[V | None]] = {}
+        # Query stats of the callers waiting on each key
+        self._waiting_stats: dict[K, list[QueryStats]] = {}
+        # The event loop only keeps weak references to tasks
+        self._tasks: set[asyncio.Task[None]] = set()
+        self.batches = 0
+
+    async def load(self, key: K) -> V | None:
+        future = self._in_flight.get(key) or self._queued.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            if not self._queued:
+                asyncio.get_running_loop().call_soon(self._dispatch)
+            self._queued[key] = future
+        stats = current_query_stats()
+        if stats is not None:
+            self._waiting_stats.setdefault(key, []).append(stats)
+        try:
+            # Shielded so one cancelled caller doesn't cancel the load for the others
+            return await asyncio.shield(future)
+        finally:
+            if stats is not None:
+                stats.check_budget()
+
+    def _dispatch(self) -> None:
+        queued, self._queued = self._queued, {}
+        self._in_flight.update(queued)
+        keys = list(queued)
+        for start in range(0, len(keys), self.max_batch_size):
+            chunk = {key: queued[key] for key in keys[start : start + self.max_batch_size]}
+            task = asyncio.ensure_future(self._run(chunk))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, futures: dict[K, "asyncio.Future[V | None]"]) -> None:
+        self.batches += 1
+        try:
+            with track_queries() as batch_stats:
+                results = await self.batch_fn(list(futures))
+        except Exception as e:
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(e)
+                    # Every waiter may have been cancelled; don't warn about it
+                    future.exception()
+        else:
+            for key, future in futures.items():
+                if not future.done():
+                    future.set_result(results.get(key))
+        finally:
+            waiting = {}
+            for key in futures:
+                self._in_flight.pop(key, None)
+                for stats in self._waiting_stats.pop(key, []):
+                    waiting[id(stats)] = stats
+            for stats in waiting.values():
+                stats.add(batch_stats)
@@ -0,0 +1,204 @@
+import bisect
+import time
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass
+from typing import Literal
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Seconds; tuned for request and query latencies
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+@dataclass(frozen=True)
+class HistogramSnapshot:
+    # Cumulative counts per upper bound, the last bound being +Inf
+    buckets: tuple[tuple[float, int], ...]
+    count: int
+    sum: float
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.bounds = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self._counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self) -> HistogramSnapshot:
+        cumulative = []
+        total = 0
+        for bound, count in zip((*self.bounds, float("inf")), self._counts, strict=True):
+            total += count
+            cumulative.append((bound, total))
+        return HistogramSnapshot(buckets=tuple(cumulative), count=self.count, sum=self.sum)
+
+
+class LabelledHistogram:
+    """A histogram per value of a single label, created on first use."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._children: dict[str, Histogram] = {}
+
+    def labels(self, value: str) -> Histogram:
+        histogram = self._children.get(value)
+        if histogram is None:
+            histogram = self._children[value] = Histogram(self.buckets)
+        return histogram
+
+    def items(self) -> list[tuple[str, Histogram]]:
+        return list(self._children.items())
+
+
+class Counter:
+    def __init__(self) -> None:
+        self.value = 0
+
+    def inc(self, amount: int = 1) -> None:
+        self.value += amount
+
+
+class Gauge:
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+Labels = dict[str, str]
+# One labelled value of a metric family, read at scrape time
+Sample = tuple[Labels, float | HistogramSnapshot]
+MetricKind = Literal["gauge", "counter", "histogram"]
+
+
+@dataclass(frozen=True)
+class MetricFamily:
+    name: str
+    help: str
+    kind: MetricKind
+    collect: Callable[[], Iterable[Sample]]
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(value)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{_escape_label(value)}"' for name, value in labels.items())
+    return f"{{{pairs}}}"
+
+
+class Registry:
+    """Metric families rendered in the Prometheus text exposition format.
+
+    Metrics are plain in-process values, so each worker process exposes its own.
+    """
+
+    def __init__(self) -> None:
+        self._families: dict[str, MetricFamily] = {}
+
+    def register(
+        self, name: str, help: str, kind: MetricKind, collect: Callable[[], Iterable[Sample]]
+    ) -> None:
+        if name in self._families:
+            raise ValueError(f"Metric {name} is already registered")
+        self._families[name] = MetricFamily(name, help, kind, collect)
+
+    def histogram(
+        self, name: str, help: str, buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        histogram = Histogram(buckets)
+        self.register(name, help, "histogram", lambda: [({}, histogram.snapshot())])
+        return histogram
+
+    def labelled_histogram(
+        self, name: str, help: str, label: str, buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> LabelledHistogram:
+        histograms = LabelledHistogram(buckets)
+        self.register(
+            name,
+            help,
+            "histogram",
+            lambda: [({label: value}, h.snapshot()) for value, h in histograms.items()],
+        )
+        return histograms
+
+    def counter(self, name: str, help: str) -> Counter:
+        counter = Counter()
+        self.register(name, help, "counter", lambda: [({}, counter.value)])
+        return counter
+
+    def gauge(self, name: str, help: str) -> Gauge:
+        gauge = Gauge()
+        self.register(name, help, "gauge", lambda: [({}, gauge.value)])
+        return gauge
+
+    def render(self) -> str:
+        lines = []
+        for family in self._families.values():
+            lines.append(f"# HELP {family.name} {family.help}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for labels, value in family.collect():
+                if isinstance(value, HistogramSnapshot):
+                    for bound, count in value.buckets:
+                        bucket_labels = _format_labels({**labels, "le": _format_value(bound)})
+                        lines.append(f"{family.name}_bucket{bucket_labels} {count}")
+                    lines.append(f"{family.name}_sum{_format_labels(labels)} {value.sum!r}")
+                    lines.append(f"{family.name}_count{_format_labels(labels)} {value.count}")
+                else:
+                    lines.append(f"{family.name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+request_latency = registry.labelled_histogram(
+    "app_http_request_duration_seconds", "HTTP request latency by route id.", "route"
+)
+requests_in_flight = registry.gauge("app_http_requests_in_flight", "HTTP requests being served.")
+
+
+class MetricsMiddleware:
+    """Records per-route latency and in-flight requests.
+
+    Routes are labelled with their OpenAPI unique id; anything not served by an
+    API route (the admin, 404s) is grouped under ``other``.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        requests_in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            requests_in_flight.dec()
+            route = getattr(scope.get("route"), "unique_id", None) or "other"
+            request_latency.labels(route).observe(time.perf_counter() - start)
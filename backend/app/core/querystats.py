@@ -0,0 +1,160 @@
+import contextlib
+import logging
+import time
+from collections.abc import Iterator
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, ExecutionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+request_query_count = registry.histogram(
+    "app_http_request_db_queries", "SQL queries run per HTTP request.", (1, 2, 5, 10, 20, 50, 100)
+)
+request_db_seconds = registry.histogram(
+    "app_http_request_db_seconds", "Time spent in SQL queries per HTTP request."
+)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+@dataclass
+class QueryStats:
+    budget: int | None = None
+    raise_on_budget: bool = False
+    count: int = 0
+    total_seconds: float = 0.0
+    slowest_seconds: float = 0.0
+    slowest_statement: str | None = None
+
+    @property
+    def over_budget(self) -> bool:
+        return self.budget is not None and self.count > self.budget
+
+    def check_budget(self) -> None:
+        if self.raise_on_budget and self.over_budget:
+            raise QueryBudgetExceeded(f"{self.count} queries exceed the budget of {self.budget}")
+
+    def add(self, other: "QueryStats") -> None:
+        """Count queries tracked elsewhere, such as a batch run on this block's behalf."""
+        self.count += other.count
+        self.total_seconds += other.total_seconds
+        if other.slowest_seconds > self.slowest_seconds:
+            self.slowest_seconds = other.slowest_seconds
+            self.slowest_statement = other.slowest_statement
+
+    def server_timing(self) -> str:
+        return (
+            f'db;dur={self.total_seconds * 1000:.1f};desc="{self.count} queries", '
+            f"db-slowest;dur={self.slowest_seconds * 1000:.1f}"
+        )
+
+
+_current_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+@contextlib.contextmanager
+def track_queries(budget: int | None = None, raise_on_budget: bool = False) -> Iterator[QueryStats]:
+    """Count queries run on instrumented engines within this block.
+
+    With ``raise_on_budget`` the query that takes the count past ``budget``
+    raises QueryBudgetExceeded, which is handy for pinning query counts in tests.
+    """
+    stats = QueryStats(budget=budget, raise_on_budget=raise_on_budget)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def current_query_stats() -> QueryStats | None:
+    """The stats of the innermost ``track_queries`` block, if any."""
+    return _current_stats.get()
+
+
+def _before_cursor_execute(
+    conn: Connection,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: ExecutionContext,
+    executemany: bool,
+) -> None:
+    if _current_stats.get() is not None:
+        context._query_start = time.perf_counter()  # type: ignore[attr-defined]
+
+
+def _after_cursor_execute(
+    conn: Connection,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: ExecutionContext,
+    executemany: bool,
+) -> None:
+    stats = _current_stats.get()
+    start = getattr(context, "_query_start", None)
+    if stats is None or start is None:
+        return
+    elapsed = time.perf_counter() - start
+    stats.count += 1
+    stats.total_seconds += elapsed
+    if elapsed > stats.slowest_seconds:
+        stats.slowest_seconds = elapsed
+        stats.slowest_statement = statement
+    stats.check_budget()
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    sync_engine = engine.sync_engine
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class QueryStatsMiddleware:
+    """Tracks queries per HTTP request and reports them in a Server-Timing header."""
+
+    def __init__(self, app: ASGIApp, budget: int | None = None, raise_on_budget: bool = False):
+        self.app = app
+        self.budget = budget
+        self.raise_on_budget = raise_on_budget
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries(self.budget, self.raise_on_budget) as stats:
+
+            async def send_with_timing(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    MutableHeaders(scope=message).append("Server-Timing", stats.server_timing())
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                request_query_count.observe(stats.count)
+                request_db_seconds.observe(stats.total_seconds)
+                if stats.over_budget:
+                    logger.warning(
+                        "%s %s ran %d queries (budget %d); slowest %.1fms: %s",
+                        scope["method"],
+                        scope["path"],
+                        stats.count,
+                        stats.budget,
+                        stats.slowest_seconds * 1000,
+                        stats.slowest_statement,
+                    )
@@ -0,0 +1,70 @@
+import time
+from collections import OrderedDict
+from typing import Protocol
+
+from app.core.config import settings
+
+
+class RateLimitStore(Protocol):
+    async def take(self, key: str, rate: float, capacity: int) -> bool:
+        """Take one token from ``key``'s bucket, returning False when it's empty."""
+        ...
+
+
+class InMemoryRateLimitStore:
+    """Token buckets held in process memory.
+
+    Each worker limits independently; plug in a shared store to enforce one
+    limit across the whole deployment.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        # key -> (tokens, monotonic time of last update)
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    async def take(self, key: str, rate: float, capacity: int) -> bool:
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(key, (float(capacity), now))
+        tokens = min(float(capacity), tokens + (now - updated_at) * rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return allowed
+
+
+class TokenBucketLimiter:
+    def __init__(self, per_minute: float, burst: int, store: RateLimitStore):
+        self.rate = per_minute / 60
+        self.burst = burst
+        self.store = store
+
+    async def allow(self, key: str) -> bool:
+        return await self.store.take(key, self.rate, self.burst)
+
+
+login_rate_limit_store: RateLimitStore = InMemoryRateLimitStore()
+username_login_limiter = TokenBucketLimiter(
+    settings.LOGIN_RATE_LIMIT_PER_MINUTE, settings.LOGIN_RATE_LIMIT_BURST, login_rate_limit_store
+)
+ip_login_limiter = TokenBucketLimiter(
+    settings.LOGIN_IP_RATE_LIMIT_PER_MINUTE,
+    settings.LOGIN_IP_RATE_LIMIT_BURST,
+    login_rate_limit_store,
+)
+
+
+async def allow_login_attempt(username: str, client_ip: str | None) -> bool:
+    """Shed login attempts over the per-IP or per-username limit before any bcrypt work.
+
+    The username limit applies per client IP, so attempts against a username from
+    one client can't lock its owner out everywhere else.
+    """
+    if client_ip and not await ip_login_limiter.allow(f"login:ip:{client_ip}"):
+        return False
+    # Usernames match ignoring case, so case variants share one bucket
+    return await username_login_limiter.allow(f"login:user:{username.lower()}:{client_ip or ''}")
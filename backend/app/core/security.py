@@ -1,24 +1,109 @@
+import hashlib
+import logging
+import math
+import secrets
+import time
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from collections.abc import Callable
+from enum import StrEnum
+from typing import Any, TypeVar
 
 import jwt
 from passlib.context import CryptContext
+from passlib.hash import bcrypt
 
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.executor import BoundedExecutor
+from app.core.metrics import registry
+from app.core.tracing import span
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Bounds for calibrated bcrypt cost; each extra round doubles the work
+BCRYPT_MIN_ROUNDS = 10
+BCRYPT_MAX_ROUNDS = 16
+
+
+def configure_password_hashing(rounds: int) -> None:
+    """Hash with ``rounds`` and report only hashes of a lower cost as needing update.
+
+    Higher costs are left alone, so workers briefly running different settings
+    during a rollout don't keep rewriting each other's hashes.
+    """
+    pwd_context.update(bcrypt__default_rounds=rounds, bcrypt__min_rounds=rounds)
+
+
+configure_password_hashing(settings.PASSWORD_HASH_ROUNDS)
+
+password_hash_executor = BoundedExecutor(
+    settings.PASSWORD_HASH_MAX_WORKERS,
+    kind=settings.PASSWORD_HASH_EXECUTOR,
+    name="password-hash",
+)
+
+password_hash_seconds = registry.labelled_histogram(
+    "app_password_hash_seconds", "Time spent hashing or verifying passwords.", "operation"
+)
+registry.register(
+    "app_password_hash_queue_depth",
+    "Password hash calls waiting for a worker.",
+    "gauge",
+    lambda: [({}, password_hash_executor.queue_depth)],
+)
+jwt_decode_seconds = registry.histogram(
+    "app_jwt_decode_seconds",
+    "Time spent decoding and verifying JWTs on token cache misses.",
+    (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.005),
+)
+
 
 ALGORITHM = "HS256"
 
 
-def create_access_token(subject: str | Any, expires_delta: timedelta) -> str:
+class TokenError(StrEnum):
+    MALFORMED = "malformed"
+    INVALID_SIGNATURE = "invalid_signature"
+    EXPIRED = "expired"
+    MISSING_CLAIM = "missing_claim"
+    INVALID = "invalid"
+
+
+class InvalidTokenError(Exception):
+    def __init__(self, reason: TokenError):
+        super().__init__(reason.value)
+        self.reason = reason
+
+
+# Decoded claims keyed by token signature; entries live until the token's own exp
+token_cache: TTLCache[str, tuple[str, dict[str, Any]]] = TTLCache(
+    max_size=settings.TOKEN_CACHE_MAX_SIZE, ttl=math.inf
+)
+
+
+def create_access_token(
+    subject: str | Any, expires_delta: timedelta, claims: dict[str, Any] | None = None
+) -> str:
     expire = datetime.now(timezone.utc) + expires_delta
-    to_encode = {"exp": expire, "sub": str(subject)}
+    to_encode = {**(claims or {}), "exp": expire, "sub": str(subject)}
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
+def generate_refresh_token() -> str:
+    return secrets.token_urlsafe(32)
+
+
+def hash_refresh_token(token: str) -> str:
+    # Refresh tokens are random, so a fast unsalted hash is enough to keep a
+    # database leak from yielding usable tokens
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
@@ -27,10 +112,111 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """Verify, returning a new hash too when the stored one is below the configured cost."""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+def calibrate_bcrypt_rounds(
+    target_ms: float,
+    min_rounds: int = BCRYPT_MIN_ROUNDS,
+    max_rounds: int = BCRYPT_MAX_ROUNDS,
+) -> int:
+    """Pick the highest bcrypt cost whose hash time stays within ``target_ms``.
+
+    Timing is noisy, so run this once (``python -m app.calibrate_password_hashing``)
+    and configure the result rather than calibrating in every worker.
+    """
+    handler = bcrypt.using(rounds=min_rounds)
+    samples = []
+    for _ in range(3):
+        start = time.perf_counter()
+        handler.hash("calibration")
+        samples.append((time.perf_counter() - start) * 1000)
+    base_ms = min(samples)
+    extra_rounds = math.floor(math.log2(target_ms / base_ms)) if target_ms > base_ms else 0
+    return max(min_rounds, min(max_rounds, min_rounds + extra_rounds))
+
+
+def _timed_call(fn: Callable[..., T], *args: Any) -> tuple[T, float]:
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+async def _run_password_hash(operation: str, fn: Callable[..., T], *args: Any) -> T:
+    # Timed on the worker so queueing for a free worker isn't counted as bcrypt time
+    with span("password.hash", operation):
+        result, elapsed = await password_hash_executor.run(_timed_call, fn, *args)
+    password_hash_seconds.labels(operation).observe(elapsed)
+    return result
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_password_hash("verify", verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_password_hash("hash", get_password_hash, password)
+
+
+_dummy_hash: str | None = None
+
+
+async def dummy_verify_password_async(plain_password: str) -> None:
+    """Spend the same bcrypt time as a real check, e.g. for usernames that don't exist."""
+    global _dummy_hash
+    if _dummy_hash is None or pwd_context.needs_update(_dummy_hash):
+        _dummy_hash = await get_password_hash_async("dummy-password")
+    await verify_password_async(plain_password, _dummy_hash)
+
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    return await _run_password_hash(
+        "verify", verify_and_update_password, plain_password, hashed_password
+    )
+
+
+def decode_token(token: str) -> dict[str, Any]:
+    signature = token.rpartition(".")[2]
+    cached = token_cache.get(signature)
+    # Compare the whole token so a reused signature can't borrow cached claims
+    if cached is not None and cached[0] == token:
+        return cached[1]
+
+    start = time.perf_counter()
+    try:
+        with span("jwt.decode"):
+            payload = jwt.decode(
+                token,
+                settings.SECRET_KEY,
+                algorithms=[ALGORITHM],
+                options={"require": ["exp", "sub"]},
+            )
+    except jwt.ExpiredSignatureError as e:
+        raise InvalidTokenError(TokenError.EXPIRED) from e
+    except jwt.InvalidSignatureError as e:
+        raise InvalidTokenError(TokenError.INVALID_SIGNATURE) from e
+    except jwt.DecodeError as e:
+        raise InvalidTokenError(TokenError.MALFORMED) from e
+    except jwt.MissingRequiredClaimError as e:
+        raise InvalidTokenError(TokenError.MISSING_CLAIM) from e
+    except jwt.PyJWTError as e:
+        raise InvalidTokenError(TokenError.INVALID) from e
+    finally:
+        jwt_decode_seconds.observe(time.perf_counter() - start)
+
+    token_cache.set(signature, (token, payload), ttl=payload["exp"] - time.time())
+    return payload
+
+
 async def validate_token(token: str) -> str | None:
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
-        sub = payload.get("sub")
-    except Exception:
+        payload = decode_token(token)
+    except InvalidTokenError:
         return None
-    return sub
+    return payload["sub"]
@@ -0,0 +1,101 @@
+import contextlib
+import random
+from collections.abc import Iterator
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from sentry_sdk.types import Event, Hint
+
+# Trace statuses Sentry gives transactions that ended in a server error
+ERROR_STATUSES = frozenset({"internal_error", "unknown_error", "unknown", "data_loss"})
+
+
+def _seconds(timestamp: datetime | float) -> float:
+    return timestamp.timestamp() if isinstance(timestamp, datetime) else timestamp
+
+
+class TransactionSampler:
+    """Samples ``sample_rate`` of transactions, optionally keeping slow or failed ones.
+
+    By default this is plain head sampling. Whether a request is slow is only
+    known once it has finished, so setting ``slow_transaction_ms`` traces every
+    request and moves the sampling to ``before_send_transaction``: sending is
+    still limited to the sample plus slow and failed transactions, but spans are
+    recorded for all of them.
+    """
+
+    def __init__(
+        self,
+        sample_rate: float,
+        slow_transaction_ms: float | None = None,
+        ignored_paths: frozenset[str] = frozenset({"/metrics"}),
+    ):
+        self.sample_rate = sample_rate
+        self.slow_transaction_ms = slow_transaction_ms
+        self.ignored_paths = ignored_paths
+
+    def traces_sampler(self, sampling_context: dict[str, Any]) -> float:
+        asgi_scope = sampling_context.get("asgi_scope") or {}
+        if asgi_scope.get("path") in self.ignored_paths:
+            return 0.0
+        parent_sampled = sampling_context.get("parent_sampled")
+        if parent_sampled is not None:
+            return float(parent_sampled)
+        return 1.0 if self.slow_transaction_ms is not None else self.sample_rate
+
+    def before_send_transaction(self, event: "Event", hint: "Hint") -> "Event | None":
+        if self.slow_transaction_ms is None or self._must_keep(event, self.slow_transaction_ms):
+            return event
+        return event if random.random() < self.sample_rate else None
+
+    @staticmethod
+    def _must_keep(event: "Event", slow_transaction_ms: float) -> bool:
+        contexts = event.get("contexts", {})
+        if contexts.get("trace", {}).get("status") in ERROR_STATUSES:
+            return True
+        status_code = contexts.get("response", {}).get("status_code")
+        if isinstance(status_code, int) and status_code >= 500:
+            return True
+        start, end = event.get("start_timestamp"), event.get("timestamp")
+        if start is None or end is None:
+            return False
+        return (_seconds(end) - _seconds(start)) * 1000 >= slow_transaction_ms
+
+
+# Set by init_sentry; until then spans skip sentry_sdk, which is only imported when enabled
+_sentry_enabled = False
+
+
+def init_sentry() -> None:
+    global _sentry_enabled
+    import sentry_sdk
+
+    sampler = TransactionSampler(
+        settings.SENTRY_TRACES_SAMPLE_RATE, settings.SENTRY_SLOW_TRANSACTION_MS
+    )
+    sentry_sdk.init(
+        dsn=str(settings.SENTRY_DSN),
+        environment=settings.ENVIRONMENT,
+        traces_sampler=sampler.traces_sampler,
+        before_send_transaction=sampler.before_send_transaction,
+        profiles_sample_rate=settings.SENTRY_PROFILES_SAMPLE_RATE,
+    )
+    _sentry_enabled = True
+
+
+@contextlib.contextmanager
+def span(op: str, name: str | None = None) -> Iterator[None]:
+    """Record a Sentry span inside the current transaction; free when there is none."""
+    if not _sentry_enabled:
+        yield
+        return
+    import sentry_sdk
+
+    if sentry_sdk.get_current_span() is None:
+        yield
+        return
+    with sentry_sdk.start_span(op=op, name=name):
+        yield
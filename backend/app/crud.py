@@ -1,53 +1,438 @@
+import asyncio
+import logging
+import sys
+import uuid
+from collections.abc import Sequence
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import (
+    ColumnElement,
+    Row,
+    Select,
+    and_,
+    case,
+    delete,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.db import session_engine
+from app.core.executor import BoundedExecutor
+from app.core.security import (
+    dummy_verify_password_async,
+    get_password_hash,
+    generate_refresh_token,
+    get_password_hash_async,
+    hash_refresh_token,
+    password_hash_executor,
+    validate_token,
+    verify_and_update_password_async,
+)
+from app.models import RefreshToken, User
+from app.schemas.user import UserCreate, UserUpdate
+from app.loaders import load_user_by_id, load_user_by_username
+from app.user_cache import attach_user, user_cache
+
+logger = logging.getLogger(__name__)
+
+# Lowercased usernames that failed to log in because they don't exist, so repeated
+# attempts skip the database; per process, so other workers may lag a creation
+missing_username_cache: TTLCache[str, bool] = TTLCache(
+    max_size=settings.LOGIN_NEGATIVE_CACHE_MAX_SIZE,
+    ttl=settings.LOGIN_NEGATIVE_CACHE_TTL_SECONDS,
+)
 
-from app.core.security import get_password_hash, validate_token, verify_password
-from app.models import User
-from app.schemas.user import UserCreate
+# Per statement: asyncpg allows 32767 bind parameters, SQLite (since 3.32) 32766
+MAX_BIND_PARAMETERS = 32766
 
 
 async def create_user(*, session: AsyncSession, user_create: UserCreate) -> User:
     user_create_dict = user_create.model_dump()
-    hashed_password = get_password_hash(user_create_dict.pop("password"))
-    db_obj = User(**user_create_dict, hashed_password=hashed_password)
-    session.add(db_obj)
+    hashed_password = await get_password_hash_async(user_create_dict.pop("password"))
+    # INSERT ... RETURNING hands back the complete row, so no refresh is needed
+    db_obj = await session.scalar(
+        insert(User).values(**user_create_dict, hashed_password=hashed_password).returning(User)
+    )
+    assert db_obj is not None
     await session.commit()
-    await session.refresh(db_obj)
+    missing_username_cache.discard(db_obj.username.lower())
+    await user_cache.invalidate(username=db_obj.username)
     return db_obj
 
 
-# async def update_user(*, session: AsyncSession, db_user: User, user_in: UserUpdate) -> Any:
-#     user_data = user_in.model_dump(exclude_unset=True)
-#     extra_data = {}
-#     if "password" in user_data:
-#         password = user_data["password"]
-#         hashed_password = get_password_hash(password)
-#         extra_data["hashed_password"] = hashed_password
-#     db_user.sqlmodel_update(user_data, update=extra_data)
-#     session.add(db_user)
-#     await session.commit()
-#     await session.refresh(db_user)
-#     return db_user
+async def bulk_create_users(
+    *,
+    session: AsyncSession,
+    user_creates: Sequence[UserCreate],
+    executor: BoundedExecutor = password_hash_executor,
+) -> list[int | None]:
+    """Insert users with multi-row INSERTs and commit once.
+
+    Each INSERT takes as many rows as fit in ``MAX_BIND_PARAMETERS``, so any
+    number of users can be passed in one call.
+
+    Returns the new id for each input, or None where the username or email
+    already exists, ignoring case (in the database or earlier in ``user_creates``).
+    """
+    unique_creates = []
+    seen_usernames: set[str] = set()
+    seen_emails: set[str] = set()
+    for user_create in user_creates:
+        username, email = user_create.username.lower(), user_create.email.lower()
+        if username in seen_usernames or email in seen_emails:
+            continue
+        seen_usernames.add(username)
+        seen_emails.add(email)
+        unique_creates.append(user_create)
+
+    hashed_passwords = await asyncio.gather(
+        *(executor.run(get_password_hash, user_create.password) for user_create in unique_creates)
+    )
+    rows = [
+        {**user_create.model_dump(exclude={"password"}), "hashed_password": hashed_password}
+        for user_create, hashed_password in zip(unique_creates, hashed_passwords, strict=True)
+    ]
+
+    created: dict[str, int] = {}
+    if rows:
+        dialect = session.get_bind().dialect.name
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        # Column defaults such as is_superuser are bound too, so count what a row compiles to
+        parameters_per_row = len(
+            insert(User).values(rows[:1]).compile(dialect=session.get_bind().dialect).params
+        )
+        rows_per_statement = MAX_BIND_PARAMETERS // parameters_per_row
+        for start in range(0, len(rows), rows_per_statement):
+            statement = (
+                insert(User)
+                .values(rows[start : start + rows_per_statement])
+                .on_conflict_do_nothing()
+                .returning(User.id, User.username)
+            )
+            result = await session.execute(statement)
+            created.update((username.lower(), user_id) for user_id, username in result.all())
+        await session.commit()
+        for username in created:
+            missing_username_cache.discard(username)
+            await user_cache.invalidate(username=username)
+
+    # Only the first occurrence of a username can have been inserted
+    return [created.pop(user_create.username.lower(), None) for user_create in user_creates]
+
+
+async def update_user(
+    *, session: AsyncSession, user_id: int, user_in: UserUpdate
+) -> User | None:
+    """Apply the fields set on ``user_in`` in one UPDATE ... RETURNING and commit.
+
+    A password change also revokes every refresh token the user holds, in the
+    same transaction. Callers changing a password must have verified the
+    current one, and should invalidate admin sessions. Returns None when the
+    user doesn't exist.
+    """
+    user_data = user_in.model_dump(exclude_unset=True, exclude_none=True)
+    if "password" in user_data:
+        user_data["hashed_password"] = await get_password_hash_async(user_data.pop("password"))
+    if not user_data:
+        return await session.get(User, user_id)
+    db_user = await session.scalar(
+        update(User).where(User.id == user_id).values(**user_data).returning(User)
+    )
+    if db_user is not None and "hashed_password" in user_data:
+        await session.execute(
+            update(RefreshToken)
+            .where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=datetime.now(timezone.utc))
+            .execution_options(synchronize_session=False)
+        )
+    await session.commit()
+    if db_user is not None:
+        await user_cache.invalidate(user_id, db_user.username)
+    return db_user
 
 
 async def get_user_by_username(*, session: AsyncSession, username: str) -> User | None:
-    statement = select(User).where(User.username == username)
-    result = await session.execute(statement)
-    session_user = result.scalar_one_or_none()
+    """Find a user by username, ignoring case."""
+    cached_user = await user_cache.get_by_username(session, username)
+    if cached_user is not None:
+        return cached_user
+    # Batched with, and shared by, concurrent lookups in this process
+    values = await load_user_by_username(session, username)
+    if values is None:
+        return None
+    session_user = await attach_user(session, values)
+    await user_cache.set(session_user)
     return session_user
 
 
+async def get_user_by_email(*, session: AsyncSession, email: str) -> User | None:
+    """Find a user by email, ignoring case."""
+    return await session.scalar(select(User).where(func.lower(User.email) == email.lower()))
+
+
+def _prefix_upper_bound(prefix: str) -> str | None:
+    """The least string above every string starting with ``prefix``, if there is one."""
+    # Nothing is above the last code point, so the bound moves to the one before it
+    stripped = prefix.rstrip(chr(sys.maxunicode))
+    if not stripped:
+        return None
+    next_code_point = ord(stripped[-1]) + 1
+    if 0xD800 <= next_code_point <= 0xDFFF:
+        # Surrogates can't be encoded; U+E000 follows U+D7FF in UTF-8 byte order
+        next_code_point = 0xE000
+    return stripped[:-1] + chr(next_code_point)
+
+
+def _prefix_filter(
+    session: AsyncSession, column: InstrumentedAttribute[str], prefix: str
+) -> ColumnElement[bool]:
+    """Match values starting with ``prefix``, ignoring case like identity lookups do."""
+    lowered, prefix = func.lower(column), prefix.lower()
+    if session.get_bind().dialect.name == "postgresql":
+        # A range on the lower() text_pattern_ops index stays index-backed in generic
+        # plans, where ``LIKE $1`` would not
+        lower_bound = lowered.op("~>=~")(prefix)
+        upper_bound = _prefix_upper_bound(prefix)
+        if upper_bound is None:
+            return lower_bound
+        return and_(lower_bound, lowered.op("~<~")(upper_bound))
+    return lowered.startswith(prefix, autoescape=True)
+
+
+async def list_users(
+    *,
+    session: AsyncSession,
+    after: int | None = None,
+    limit: int = 50,
+    username_prefix: str | None = None,
+    email_prefix: str | None = None,
+) -> Sequence[Row[Any]]:
+    """Return up to ``limit`` users ordered by id, starting after id ``after``."""
+    statement = select(
+        User.id, User.username, User.email, User.first_name, User.last_name, User.is_superuser
+    )
+    if after is not None:
+        statement = statement.where(User.id > after)
+    if username_prefix:
+        statement = statement.where(_prefix_filter(session, User.username, username_prefix))
+    if email_prefix:
+        statement = statement.where(_prefix_filter(session, User.email, email_prefix))
+    result = await session.execute(statement.order_by(User.id).limit(limit))
+    return result.all()
+
+
+def _escape_like(value: str) -> str:
+    # Same escape character as SQLAlchemy's autoescape, which needs no quoting rules
+    return value.replace("/", "//").replace("%", "/%").replace("_", "/_")
+
+
+async def search_users(
+    *, session: AsyncSession, query: str, limit: int = 20
+) -> Sequence[Row[Any]]:
+    """Return up to ``limit`` users matching ``query``, best match first.
+
+    A user matches when the username, email, first or last name starts with
+    ``query`` (case-insensitively) or, on PostgreSQL, contains a word similar to
+    it per pg_trgm's ``word_similarity``. Prefix matches rank first, then
+    similarity. Elsewhere a substring match stands in for the fuzzy one.
+    """
+    columns = (User.username, User.email, User.first_name, User.last_name)
+    escaped = _escape_like(query)
+    prefix_match = or_(*(column.ilike(f"{escaped}%", escape="/") for column in columns))
+    statement = select(
+        User.id, User.username, User.email, User.first_name, User.last_name, User.is_superuser
+    )
+    similarity: ColumnElement[Any]
+    if session.get_bind().dialect.name == "postgresql":
+        # Both ILIKE and <% are served by the ix_app_user_search_trgm GIN index
+        term = literal(query)
+        fuzzy_match = or_(*(term.op("<%")(column) for column in columns))
+        similarity = func.greatest(*(func.word_similarity(term, column) for column in columns))
+    else:
+        fuzzy_match = or_(*(column.ilike(f"%{escaped}%", escape="/") for column in columns))
+        similarity = literal(0)
+    statement = (
+        statement.where(or_(prefix_match, fuzzy_match))
+        .order_by(case((prefix_match, 1), else_=0).desc(), similarity.desc(), User.id)
+        .limit(limit)
+    )
+    result = await session.execute(statement)
+    return result.all()
+
+
+def _select_credentials(username: str) -> Select[tuple[User, str]]:
+    return select(User, User.hashed_password).where(
+        func.lower(User.username) == username.lower()
+    )
+
+
 async def authenticate(*, session: AsyncSession, username: str, password: str) -> User | None:
-    db_user = await get_user_by_username(session=session, username=username)
-    if not db_user:
+    """Check credentials, upgrading a hash stored below the configured bcrypt cost.
+
+    The upgraded hash is saved in a transaction of its own on ``session``'s
+    engine (which must be writable); the caller's transaction is left as it was.
+    """
+    row = None
+    if missing_username_cache.get(username.lower()) is None:
+        # One query for the user and its hash, which the user cache leaves out; the
+        # caller's pending changes aren't flushed
+        with session.no_autoflush:
+            result = await session.execute(_select_credentials(username))
+            row = result.first()
+    if row is None:
+        missing_username_cache.set(username.lower(), True)
+        # Same bcrypt cost as a real check, so response time doesn't reveal the username
+        await dummy_verify_password_async(password)
         return None
-    if not verify_password(password, db_user.hashed_password):
+    db_user, hashed_password = row
+    verified, new_hash = await verify_and_update_password_async(password, hashed_password)
+    if not verified:
         return None
+    if new_hash:
+        await _store_upgraded_hash(session, db_user, hashed_password, new_hash)
     return db_user
 
 
+async def _store_upgraded_hash(
+    session: AsyncSession, user: User, old_hash: str, new_hash: str
+) -> None:
+    async with AsyncSession(bind=session_engine(session)) as rehash_session:
+        # Only replaces the hash that was verified, so a concurrent password change wins
+        await rehash_session.execute(
+            update(User)
+            .where(User.id == user.id, User.hashed_password == old_hash)
+            .values(hashed_password=new_hash)
+        )
+        await rehash_session.commit()
+    set_committed_value(user, "hashed_password", new_hash)
+
+
 async def get_current_user(session: AsyncSession, token: str) -> User | None:
     sub = await validate_token(token)
     if not sub:
         return None
-    return await session.get(User, int(sub))
+    user_id = int(sub)
+    user = await user_cache.get_by_id(session, user_id)
+    if user is not None:
+        return user
+    values = await load_user_by_id(session, user_id)
+    if values is None:
+        return None
+    user = await attach_user(session, values)
+    await user_cache.set(user)
+    return user
+
+
+async def create_refresh_token(
+    *, session: AsyncSession, user_id: int, family_id: str | None = None
+) -> str:
+    """Store a new refresh token for ``user_id``, commit, and return the token."""
+    token = generate_refresh_token()
+    now = datetime.now(timezone.utc)
+    session.add(
+        RefreshToken(
+            user_id=user_id,
+            family_id=family_id or uuid.uuid4().hex,
+            token_hash=hash_refresh_token(token),
+            created_at=now,
+            expires_at=now + timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES),
+        )
+    )
+    await session.commit()
+    return token
+
+
+async def rotate_refresh_token(
+    *, session: AsyncSession, token: str
+) -> tuple[User, str] | None:
+    """Exchange a refresh token for its user and a new token in the same family.
+
+    Each token works once. One presented again after it was exchanged has leaked,
+    so its whole family is revoked and the holder has to log in again. Returns
+    None for unknown, expired, revoked or reused tokens.
+    """
+    token_hash = hash_refresh_token(token)
+    now = datetime.now(timezone.utc)
+    # Claimed in a single UPDATE so two concurrent refreshes can't both succeed
+    result = await session.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.token_hash == token_hash,
+            RefreshToken.used_at.is_(None),
+            RefreshToken.revoked_at.is_(None),
+            RefreshToken.expires_at > now,
+        )
+        .values(used_at=now)
+        .returning(RefreshToken.user_id, RefreshToken.family_id)
+        .execution_options(synchronize_session=False)
+    )
+    claimed = result.one_or_none()
+    if claimed is None:
+        reused_family_id = await session.scalar(
+            select(RefreshToken.family_id).where(
+                RefreshToken.token_hash == token_hash, RefreshToken.used_at.is_not(None)
+            )
+        )
+        if reused_family_id is not None:
+            logger.warning("Refresh token reused, revoking family %s", reused_family_id)
+            await revoke_refresh_token_family(session=session, family_id=reused_family_id)
+        return None
+
+    user_id, family_id = claimed
+    user = await session.get(User, user_id)
+    if user is None:
+        await session.rollback()
+        return None
+    new_token = await create_refresh_token(session=session, user_id=user_id, family_id=family_id)
+    return user, new_token
+
+
+async def revoke_refresh_token_family(*, session: AsyncSession, family_id: str) -> None:
+    await session.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.now(timezone.utc))
+        .execution_options(synchronize_session=False)
+    )
+    await session.commit()
+
+
+async def revoke_refresh_token(*, session: AsyncSession, token: str) -> None:
+    """Revoke ``token`` and every token rotated from the same login."""
+    family_id = await session.scalar(
+        select(RefreshToken.family_id).where(
+            RefreshToken.token_hash == hash_refresh_token(token)
+        )
+    )
+    if family_id is not None:
+        await revoke_refresh_token_family(session=session, family_id=family_id)
+
+
+async def prune_refresh_tokens(*, session: AsyncSession) -> int:
+    """Delete expired refresh tokens, returning how many were removed."""
+    result = await session.execute(
+        delete(RefreshToken)
+        .where(RefreshToken.expires_at <= datetime.now(timezone.utc))
+        .execution_options(synchronize_session=False)
+    )
+    await session.commit()
+    return result.rowcount  # type: ignore[attr-defined]
+
+
+async def prime_user_lookups(session: AsyncSession) -> None:
+    """Run the hot user lookups once so the connection has them prepared."""
+    await session.execute(_select_credentials(""))
+    # The same statements whether batched or run on the caller's connection
+    await load_user_by_id(session, 0)
+    await load_user_by_username(session, "")
@@ -0,0 +1,150 @@
+"""Bulk-import users from a CSV or JSONL file.
+
+    uv run python -m app.import_users users.csv
+    uv run python -m app.import_users users.jsonl --batch-size 2000 --workers 8
+
+CSV files need a header row with the UserCreate fields; JSONL files hold one
+UserCreate object per line. Rows that fail validation or collide with an
+existing username/email are reported by line number and skipped.
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import os
+import sys
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import sessionmanager
+from app.core.executor import BoundedExecutor
+from app.core.security import password_hash_executor
+from app.crud import bulk_create_users
+from app.schemas.user import UserCreate
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RowError:
+    line: int
+    message: str
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    errors: list[RowError] = field(default_factory=list)
+
+
+# (line number, parsed record or the reason it couldn't be parsed)
+Record = tuple[int, dict[str, Any] | str]
+
+
+def read_records(path: Path) -> Iterator[Record]:
+    with path.open(newline="") as f:
+        if path.suffix == ".csv":
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+        else:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_number, json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_number, f"invalid JSON: {e.msg}"
+
+
+async def import_users(
+    *,
+    session: AsyncSession,
+    records: Iterable[Record],
+    batch_size: int = 1000,
+    executor: BoundedExecutor = password_hash_executor,
+) -> ImportResult:
+    result = ImportResult()
+    batch: list[tuple[int, UserCreate]] = []
+
+    async def flush() -> None:
+        user_ids = await bulk_create_users(
+            session=session,
+            user_creates=[user_create for _, user_create in batch],
+            executor=executor,
+        )
+        for (line, _), user_id in zip(batch, user_ids, strict=True):
+            if user_id is None:
+                result.errors.append(RowError(line, "username or email already exists"))
+            else:
+                result.created += 1
+        batch.clear()
+
+    for line, record in records:
+        if isinstance(record, str):
+            result.errors.append(RowError(line, record))
+            continue
+        try:
+            batch.append((line, UserCreate.model_validate(record)))
+        except ValidationError as e:
+            message = "; ".join(
+                f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in e.errors()
+            )
+            result.errors.append(RowError(line, message))
+            continue
+        if len(batch) >= batch_size:
+            await flush()
+    if batch:
+        await flush()
+    return result
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="Bulk-import users from CSV or JSONL.")
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="processes hashing passwords in parallel",
+    )
+    args = parser.parse_args()
+
+    executor = BoundedExecutor(args.workers, kind="process", name="import-hash")
+    start = time.perf_counter()
+    try:
+        async with sessionmanager.session() as session:
+            result = await import_users(
+                session=session,
+                records=read_records(args.path),
+                batch_size=args.batch_size,
+                executor=executor,
+            )
+    finally:
+        executor.shutdown()
+    elapsed = time.perf_counter() - start
+
+    for error in result.errors:
+        logger.error("line %d: %s", error.line, error.message)
+    logger.info(
+        "Imported %d users in %.1fs (%.0f users/min), %d rows failed",
+        result.created,
+        elapsed,
+        result.created / elapsed * 60 if elapsed else 0,
+        len(result.errors),
+    )
+    return 1 if result.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
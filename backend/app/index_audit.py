@@ -0,0 +1,304 @@
+"""Report redundant and unused indexes on the application's tables.
+
+    uv run python -m app.index_audit
+
+Indexes declared in ``app.models`` are checked for redundancy: an index whose
+key columns lead another index with the same method, operator classes and
+predicate (and whose INCLUDE columns that index also holds) adds write cost
+without serving any query the other can't. On PostgreSQL the live database is
+checked the same way, which catches indexes left behind by hand or by old
+migrations, and non-unique indexes that ``pg_stat_user_indexes`` shows were
+never scanned since the statistics were last reset are listed as unused. Each
+standby keeps its own statistics, so scans are added up over the primary and
+every read replica; when a replica can't be reached no index is reported unused.
+
+Exits non-zero when a redundant index is found.
+"""
+
+import asyncio
+import logging
+import sys
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Any
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.db import sessionmanager
+from app.models import Base
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class IndexInfo:
+    table: str
+    name: str
+    # Key columns, or the SQL of expression keys
+    columns: tuple[str, ...]
+    unique: bool = False
+    primary: bool = False
+    method: str = "btree"
+    # Non-default operator class per key column, None for the default
+    opclasses: tuple[str | None, ...] = ()
+    include: tuple[str, ...] = ()
+    predicate: str | None = None
+    # Live database only
+    scans: int | None = None
+    size_bytes: int | None = None
+
+    def describe(self) -> str:
+        include = f" INCLUDE ({', '.join(self.include)})" if self.include else ""
+        return f"{self.table}.{self.name} ({', '.join(self.columns)}){include}"
+
+
+def covers(index: IndexInfo, other: IndexInfo) -> bool:
+    """Whether ``index`` serves every lookup and constraint ``other`` does."""
+    if (
+        index.table != other.table
+        or index.method != other.method
+        or index.predicate != other.predicate
+    ):
+        return False
+    prefix = len(other.columns)
+    if index.method == "btree":
+        # A B-tree serves lookups on any leading subset of its columns
+        if index.columns[:prefix] != other.columns:
+            return False
+    elif index.columns != other.columns:
+        return False
+    if index.opclasses[:prefix] != other.opclasses:
+        return False
+    if not set(other.include) <= set(index.columns + index.include):
+        return False
+    # Uniqueness over more columns is a weaker constraint
+    return not other.unique or (index.unique and prefix == len(index.columns))
+
+
+def _keep_rank(index: IndexInfo) -> tuple[bool, bool, str]:
+    # Of identical indexes keep the primary key, then unique ones, then by name
+    return (not index.primary, not index.unique, index.name)
+
+
+def find_redundant(indexes: Sequence[IndexInfo]) -> list[tuple[IndexInfo, IndexInfo]]:
+    """Return (redundant index, index covering it) pairs."""
+    redundant = []
+    for other in indexes:
+        covering = [
+            index
+            for index in indexes
+            if index is not other
+            and covers(index, other)
+            # Of two identical indexes only one is redundant
+            and not (covers(other, index) and _keep_rank(other) < _keep_rank(index))
+        ]
+        if covering:
+            redundant.append((other, min(covering, key=_keep_rank)))
+    return redundant
+
+
+def _column_sql(expression: str | sa.ColumnElement[Any]) -> str:
+    if isinstance(expression, str):
+        return expression
+    if isinstance(expression, sa.Column):
+        return expression.name
+    compiled = expression.compile(
+        dialect=postgresql.dialect(), compile_kwargs={"include_table": False}
+    )
+    return str(compiled)
+
+
+def metadata_indexes(metadata: sa.MetaData) -> list[IndexInfo]:
+    """Indexes the given metadata creates, including those behind constraints."""
+    indexes = []
+    for table in metadata.sorted_tables:
+        primary_key = table.primary_key
+        if primary_key.columns:
+            indexes.append(
+                IndexInfo(
+                    table=table.name,
+                    name=str(primary_key.name or f"{table.name}_pkey"),
+                    columns=tuple(column.name for column in primary_key.columns),
+                    unique=True,
+                    primary=True,
+                    opclasses=(None,) * len(primary_key.columns),
+                )
+            )
+        for constraint in table.constraints:
+            if isinstance(constraint, sa.UniqueConstraint):
+                indexes.append(
+                    IndexInfo(
+                        table=table.name,
+                        name=str(
+                            constraint.name
+                            or f"{table.name}_{'_'.join(constraint.columns.keys())}_key"
+                        ),
+                        columns=tuple(column.name for column in constraint.columns),
+                        unique=True,
+                        opclasses=(None,) * len(constraint.columns),
+                    )
+                )
+        for index in table.indexes:
+            options = index.dialect_options["postgresql"]
+            ops = options["ops"] or {}
+            columns = tuple(_column_sql(expression) for expression in index.expressions)
+            # Operator classes are keyed by column name, or by label for expressions
+            op_keys = [getattr(expression, "name", None) for expression in index.expressions]
+            where = options["where"]
+            indexes.append(
+                IndexInfo(
+                    table=table.name,
+                    name=str(index.name),
+                    columns=columns,
+                    unique=bool(index.unique),
+                    method=options["using"] or "btree",
+                    opclasses=tuple(ops.get(key) for key in op_keys),
+                    include=tuple(str(column) for column in options["include"] or ()),
+                    predicate=None if where is None else _column_sql(where),
+                )
+            )
+    return indexes
+
+
+LIVE_INDEXES_QUERY = sa.text(
+    """
+    SELECT
+        t.relname AS table_name,
+        i.relname AS index_name,
+        ix.indisunique AS is_unique,
+        ix.indisprimary AS is_primary,
+        am.amname AS method,
+        ix.indnkeyatts AS key_count,
+        array(
+            SELECT pg_get_indexdef(ix.indexrelid, k + 1, true)
+            FROM generate_subscripts(ix.indkey, 1) AS k
+            ORDER BY k
+        ) AS columns,
+        array(
+            SELECT CASE WHEN opc.opcdefault THEN NULL ELSE opc.opcname::text END
+            FROM unnest(ix.indclass) WITH ORDINALITY AS c(opclass_oid, n)
+            JOIN pg_opclass opc ON opc.oid = c.opclass_oid
+            ORDER BY c.n
+        ) AS opclasses,
+        pg_get_expr(ix.indpred, ix.indrelid, true) AS predicate,
+        s.idx_scan AS scans,
+        pg_relation_size(ix.indexrelid) AS size_bytes
+    FROM pg_index ix
+    JOIN pg_class i ON i.oid = ix.indexrelid
+    JOIN pg_class t ON t.oid = ix.indrelid
+    JOIN pg_namespace n ON n.oid = t.relnamespace
+    JOIN pg_am am ON am.oid = i.relam
+    LEFT JOIN pg_stat_user_indexes s ON s.indexrelid = ix.indexrelid
+    WHERE n.nspname = current_schema() AND t.relname = ANY(:tables)
+    ORDER BY t.relname, i.relname
+    """
+)
+
+
+async def live_indexes(conn: AsyncConnection, tables: Iterable[str]) -> list[IndexInfo]:
+    """Indexes in the connected PostgreSQL database on ``tables``, with usage statistics."""
+    result = await conn.execute(LIVE_INDEXES_QUERY, {"tables": list(tables)})
+    return [
+        IndexInfo(
+            table=row.table_name,
+            name=row.index_name,
+            columns=tuple(row.columns[: row.key_count]),
+            unique=row.is_unique,
+            primary=row.is_primary,
+            method=row.method,
+            opclasses=tuple(row.opclasses),
+            include=tuple(row.columns[row.key_count :]),
+            predicate=row.predicate,
+            scans=row.scans,
+            size_bytes=row.size_bytes,
+        )
+        for row in result
+    ]
+
+
+def add_scans(
+    indexes: Sequence[IndexInfo], replica_indexes: Iterable[Sequence[IndexInfo]]
+) -> list[IndexInfo]:
+    """``indexes`` with the scans the same indexes saw on each replica added."""
+    scans = {(index.table, index.name): index.scans for index in indexes}
+    for replica in replica_indexes:
+        for index in replica:
+            key = (index.table, index.name)
+            if key in scans and index.scans is not None:
+                scans[key] = (scans[key] or 0) + index.scans
+    return [replace(index, scans=scans[(index.table, index.name)]) for index in indexes]
+
+
+def find_unused(indexes: Iterable[IndexInfo]) -> list[IndexInfo]:
+    """Indexes never scanned; unique ones are left out as they enforce constraints."""
+    return [index for index in indexes if index.scans == 0 and not index.unique]
+
+
+async def stats_reset_at(conn: AsyncConnection) -> datetime | None:
+    return await conn.scalar(
+        sa.text("SELECT stats_reset FROM pg_stat_database WHERE datname = current_database()")
+    )
+
+
+def report_redundant(source: str, redundant: list[tuple[IndexInfo, IndexInfo]]) -> None:
+    if not redundant:
+        logger.info("No redundant indexes in %s", source)
+    for index, covering in redundant:
+        logger.warning(
+            "Redundant index in %s: %s is covered by %s",
+            source,
+            index.describe(),
+            covering.describe(),
+        )
+
+
+async def main() -> int:
+    redundant = find_redundant(metadata_indexes(Base.metadata))
+    report_redundant("app.models", redundant)
+
+    if sessionmanager.engine.dialect.name != "postgresql":
+        logger.info("Skipping the live database audit, which needs PostgreSQL")
+        return 1 if redundant else 0
+
+    async with sessionmanager.connect() as conn:
+        indexes = await live_indexes(conn, Base.metadata.tables)
+        reset_at = await stats_reset_at(conn)
+    replica_indexes = []
+    for engine in sessionmanager.replica_engines:
+        try:
+            async with engine.connect() as conn:
+                replica_indexes.append(await live_indexes(conn, Base.metadata.tables))
+        except (OSError, asyncio.TimeoutError, DBAPIError) as e:
+            logger.warning(
+                "Read replica %s unavailable: %r",
+                engine.url.render_as_string(hide_password=True),
+                e,
+            )
+    scans_complete = len(replica_indexes) == len(sessionmanager.replica_engines)
+    indexes = add_scans(indexes, replica_indexes)
+    await sessionmanager.close()
+
+    live_redundant = find_redundant(indexes)
+    report_redundant("the database", live_redundant)
+    if not scans_complete:
+        logger.warning("Skipping the unused index report, which needs every replica's scans")
+        return 1 if redundant or live_redundant else 0
+    # The primary's reset time; replicas reset their statistics independently
+    since = f"since {reset_at:%Y-%m-%d %H:%M}" if reset_at else "since the server started"
+    for index in find_unused(indexes):
+        logger.warning(
+            "Unused index (0 scans %s): %s, %.1f MB",
+            since,
+            index.describe(),
+            (index.size_bytes or 0) / 1024 / 1024,
+        )
+    return 1 if redundant or live_redundant else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
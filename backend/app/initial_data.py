@@ -1,13 +1,11 @@
 import logging
 import asyncio
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 
 from app.core.db import sessionmanager
-from app.models import User
 from app.schemas.user import SuperUserCreate
 from app.core.config import settings
-from app.crud import create_user
+from app.crud import create_user, get_user_by_email
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -22,10 +20,7 @@ async def init_db(session: AsyncSession) -> None:
     # This works because the models are already imported and registered from app.models
     # SQLModel.metadata.create_all(engine)
 
-    result = await session.execute(
-        select(User).where(User.email == settings.FIRST_SUPERUSER)
-    )
-    user = result.scalar_one_or_none()
+    user = await get_user_by_email(session=session, email=settings.FIRST_SUPERUSER)
     if not user:
         logger.info("Creating superuser")
         user_in = SuperUserCreate(
@@ -0,0 +1,18 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+
+from app.core.config import settings
+from app.core.db import sessionmanager
+from app.core.security import password_hash_executor
+from app.crud import prime_user_lookups
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Startup and shutdown shared by the API and the standalone admin app."""
+    await sessionmanager.warmup(settings.DB_POOL_WARMUP_CONNECTIONS, prime=prime_user_lookups)
+    yield
+    await sessionmanager.close()
+    password_hash_executor.shutdown()
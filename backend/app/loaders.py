@@ -0,0 +1,106 @@
+import asyncio
+import weakref
+from collections.abc import Mapping, Sequence
+from typing import Any
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from app.core.db import session_engine
+from app.core.loader import BatchLoader
+from app.models import User
+from app.user_cache import USER_COLUMNS
+
+UserValues = dict[str, Any]
+Column = InstrumentedAttribute[Any] | sa.ColumnElement[Any]
+
+
+def _any_of(engine: AsyncEngine, column: Column, values: Sequence[Any]) -> sa.ColumnElement[bool]:
+    if engine.dialect.name == "postgresql":
+        # One array parameter keeps a single prepared statement for every batch size
+        array = sa.bindparam("values", list(values), type_=postgresql.ARRAY(column.type))
+        return column == sa.any_(array)
+    return column.in_(values)
+
+
+def _select_users(
+    engine: AsyncEngine, column: Column, keys: Sequence[Any]
+) -> sa.Select[Any]:
+    return sa.select(*(getattr(User, key) for key in USER_COLUMNS)).where(
+        _any_of(engine, column, keys)
+    )
+
+
+class UserLoaders:
+    """Batched user lookups against one engine; rows come back as column values.
+
+    Each batch runs on a pooled connection of its own, so it sees committed data
+    only. Go through ``load_user_by_id`` and ``load_user_by_username``, which only
+    batch for sessions outside a transaction: lookups inside one belong to it, and
+    a caller holding a connection while waiting on another could starve the pool.
+    ``by_username`` takes lowercased usernames and matches them ignoring case.
+    """
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        self.by_id: BatchLoader[int, UserValues] = BatchLoader(self._load_by_id)
+        self.by_username: BatchLoader[str, UserValues] = BatchLoader(self._load_by_username)
+
+    async def _load(self, column: Column, keys: Sequence[Any]) -> list[Any]:
+        async with AsyncSession(bind=self.engine) as session:
+            result = await session.execute(_select_users(self.engine, column, keys))
+            return [dict(row._mapping) for row in result]
+
+    async def _load_by_id(self, ids: Sequence[int]) -> Mapping[int, UserValues]:
+        return {values["id"]: values for values in await self._load(User.id, ids)}
+
+    async def _load_by_username(self, usernames: Sequence[str]) -> Mapping[str, UserValues]:
+        # Served by the lower(username) unique index
+        rows = await self._load(sa.func.lower(User.username), usernames)
+        return {values["username"].lower(): values for values in rows}
+
+
+_loaders: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, dict[AsyncEngine, UserLoaders]
+] = weakref.WeakKeyDictionary()
+
+
+def user_loaders(session: AsyncSession) -> UserLoaders:
+    """The loaders for the running event loop and the engine ``session`` reads from."""
+    engine = session_engine(session)
+    per_engine = _loaders.setdefault(asyncio.get_running_loop(), {})
+    loaders = per_engine.get(engine)
+    if loaders is None:
+        loaders = per_engine[engine] = UserLoaders(engine)
+    return loaders
+
+
+def _in_transaction(session: AsyncSession) -> bool:
+    # Replica sessions are bound to a connection checked out up front
+    return isinstance(session.bind, AsyncConnection) or session.in_transaction()
+
+
+async def _load_one(session: AsyncSession, column: Column, key: Any) -> UserValues | None:
+    result = await session.execute(_select_users(session_engine(session), column, [key]))
+    row = result.first()
+    return None if row is None else dict(row._mapping)
+
+
+async def load_user_by_id(session: AsyncSession, user_id: int) -> UserValues | None:
+    """Column values of user ``user_id``, batched with concurrent lookups when possible.
+
+    A session inside a transaction, or bound to a replica connection, queries on
+    its own connection rather than waiting on a second pooled one.
+    """
+    if _in_transaction(session):
+        return await _load_one(session, User.id, user_id)
+    return await user_loaders(session).by_id.load(user_id)
+
+
+async def load_user_by_username(session: AsyncSession, username: str) -> UserValues | None:
+    """Like ``load_user_by_id``, for a username matched ignoring case."""
+    if _in_transaction(session):
+        return await _load_one(session, sa.func.lower(User.username), username.lower())
+    return await user_loaders(session).by_username.load(username.lower())
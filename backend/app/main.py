@@ -1,9 +1,13 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.routing import APIRoute
-import sentry_sdk
 from fastapi.middleware.cors import CORSMiddleware
+from app.api.main import api_router
 from app.core.config import settings
-from app.admin import get_admin
+from app.core.metrics import MetricsMiddleware, registry
+from app.core.querystats import QueryStatsMiddleware
+from app.core.tracing import init_sentry
+from app.lifespan import lifespan
 
 
 def custom_generate_unique_id(route: APIRoute) -> str:
@@ -13,13 +17,35 @@ def custom_generate_unique_id(route: APIRoute) -> str:
 app = FastAPI(
     title=settings.PROJECT_NAME,
     generate_unique_id_function=custom_generate_unique_id,
+    lifespan=lifespan,
 )
 
-get_admin(app)
+app.include_router(api_router, prefix=settings.API_V1_STR)
+
+if settings.ADMIN_MODE == "mounted":
+    # Imported here so API workers without the admin never load sqladmin
+    from app.admin import get_admin
+
+    get_admin(app)
 
 
 if settings.SENTRY_DSN and settings.ENVIRONMENT != "local":
-    sentry_sdk.init(dsn=str(settings.SENTRY_DSN), enable_tracing=True)
+    init_sentry()
+
+
+app.add_middleware(
+    QueryStatsMiddleware,
+    budget=settings.SQL_QUERY_BUDGET,
+    raise_on_budget=settings.SQL_QUERY_BUDGET_RAISE,
+)
+
+
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/metrics", tags=["metrics"], include_in_schema=False)
+    async def metrics() -> PlainTextResponse:
+        return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
 
 
 if settings.all_cors_origins:
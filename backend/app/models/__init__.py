@@ -1,3 +1,4 @@
 from app.core.db import Base  # noqa: F401
 
 from .user import User  # noqa: F401
+from .refresh_token import RefreshToken  # noqa: F401
@@ -5,11 +5,30 @@ from . import Base
 
 class User(Base):
     __tablename__ = "app_user"
+    __table_args__ = (
+        # Trigram index behind /users/search: serves ILIKE prefix and word-similarity
+        # matches on every searchable column. Needs pg_trgm, so PostgreSQL only.
+        sa.Index(
+            "ix_app_user_search_trgm",
+            "username",
+            "email",
+            "first_name",
+            "last_name",
+            postgresql_using="gin",
+            postgresql_ops={
+                "username": "gin_trgm_ops",
+                "email": "gin_trgm_ops",
+                "first_name": "gin_trgm_ops",
+                "last_name": "gin_trgm_ops",
+            },
+        ).ddl_if(dialect="postgresql"),
+    )
 
     # todo: remake to uuid
-    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True, index=True)
-    username: Mapped[str] = mapped_column(index=True, unique=True)
-    email: Mapped[str] = mapped_column(index=True, unique=True)
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    # Unique ignoring case; see the lower() indexes below
+    username: Mapped[str]
+    email: Mapped[str]
     first_name: Mapped[str]
     last_name: Mapped[str]
     hashed_password: Mapped[str] = mapped_column(sa.String(255), nullable=False)
@@ -17,3 +36,28 @@ class User(Base):
 
     def __repr__(self) -> str:
         return f"User(id={self.id}, username={self.username}, is_superuser={self.is_superuser})"
+
+
+# Usernames and emails are unique and looked up case-insensitively; lookups
+# compare lower(column) so these indexes serve them
+sa.Index("ix_app_user_username_lower", sa.func.lower(User.username), unique=True)
+sa.Index("ix_app_user_email_lower", sa.func.lower(User.email), unique=True)
+# Byte-wise ordering so case-insensitive prefix range filters can use an index
+# under any collation
+sa.Index(
+    "ix_app_user_username_pattern",
+    sa.func.lower(User.username).label("username_lower"),
+    postgresql_ops={"username_lower": "text_pattern_ops"},
+)
+sa.Index(
+    "ix_app_user_email_pattern",
+    sa.func.lower(User.email).label("email_lower"),
+    postgresql_ops={"email_lower": "text_pattern_ops"},
+)
+
+# create_all (tests, benchmarks) needs the extension before the trigram index
+sa.event.listen(
+    User.__table__,
+    "before_create",
+    sa.DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
@@ -0,0 +1,24 @@
+"""Delete expired refresh tokens; run periodically, e.g. daily from cron.
+
+    uv run python -m app.prune_refresh_tokens
+"""
+
+import asyncio
+import logging
+
+from app.core.db import sessionmanager
+from app.crud import prune_refresh_tokens
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def main() -> None:
+    async with sessionmanager.session() as session:
+        deleted = await prune_refresh_tokens(session=session)
+    await sessionmanager.close()
+    logger.info("Deleted %d expired refresh tokens", deleted)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
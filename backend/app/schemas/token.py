@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+
+
+class Token(BaseModel):
+    access_token: str
+    token_type: str = "bearer"
+    # Seconds until the access token expires
+    expires_in: int
+    refresh_token: str
+
+
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
+
+
+class TokenUser(BaseModel):
+    """The caller as described by their access token, without a database read."""
+
+    id: int
+    is_superuser: bool
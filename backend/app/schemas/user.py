@@ -16,6 +16,7 @@ class SuperUserCreate(UserCreate):
 class UserUpdate(BaseModel):
     first_name: str | None = None
     last_name: str | None = None
+    password: str | None = None
 
 
 class UserOut(BaseModel):
@@ -25,3 +26,9 @@ class UserOut(BaseModel):
     first_name: str
     last_name: str
     is_superuser: bool
+
+
+class UsersPage(BaseModel):
+    data: list[UserOut]
+    # Pass as ``after`` to fetch the next page; None on the last page
+    next_cursor: int | None
@@ -0,0 +1,110 @@
+import json
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.util import identity_key
+
+from app.core.cache import CacheBackend, InMemoryCacheBackend, RedisCacheBackend
+from app.core.config import settings
+from app.core.metrics import registry
+from app.models import User
+
+# Password hashes stay out of the cache, which may be a shared Redis; users
+# attached from cached values leave ``hashed_password`` unloaded
+USER_COLUMNS = [
+    attr.key for attr in User.__mapper__.column_attrs if attr.key != "hashed_password"
+]
+
+user_cache_hits = registry.counter("app_user_cache_hits_total", "User lookups served from cache.")
+user_cache_misses = registry.counter(
+    "app_user_cache_misses_total", "User lookups that had to query the database."
+)
+
+
+async def attach_user(session: AsyncSession, values: dict) -> User:
+    """Add a user row loaded elsewhere to ``session`` as if it had queried it.
+
+    Like ``session.get``, a user the session already holds is returned as is.
+    """
+    existing = session.sync_session.identity_map.get(identity_key(User, values["id"]))
+    if existing is not None:
+        return existing
+    user = User(**values)
+    make_transient_to_detached(user)
+    return await session.merge(user, load=False)
+
+
+class UserCache:
+    """User rows cached by id, with (lowercased) usernames pointing at the id.
+
+    A username lookup checks the username on the row it ends up with, so after a
+    rename the old name misses rather than resolving to the renamed user.
+    Cached users are merged into the caller's session without a query, so they
+    can be modified and committed like loaded ones, but their password hash is
+    not loaded and has to be selected explicitly.
+    """
+
+    def __init__(self, backend: CacheBackend | None, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+
+    @staticmethod
+    def _id_key(user_id: int) -> str:
+        return f"user:v2:id:{user_id}"
+
+    @staticmethod
+    def _username_key(username: str) -> str:
+        return f"user:v2:username:{username.lower()}"
+
+    async def get_by_id(self, session: AsyncSession, user_id: int) -> User | None:
+        if self.backend is None:
+            return None
+        data = await self.backend.get(self._id_key(user_id))
+        if data is None:
+            user_cache_misses.inc()
+            return None
+        user_cache_hits.inc()
+        return await attach_user(session, json.loads(data))
+
+    async def get_by_username(self, session: AsyncSession, username: str) -> User | None:
+        if self.backend is None:
+            return None
+        user_id = await self.backend.get(self._username_key(username))
+        data = await self.backend.get(self._id_key(int(user_id))) if user_id else None
+        values = json.loads(data) if data else None
+        if values is None or values["username"].lower() != username.lower():
+            user_cache_misses.inc()
+            return None
+        user_cache_hits.inc()
+        return await attach_user(session, values)
+
+    async def set(self, user: User) -> None:
+        if self.backend is None:
+            return
+        data = json.dumps({key: getattr(user, key) for key in USER_COLUMNS})
+        await self.backend.set(self._id_key(user.id), data, self.ttl)
+        await self.backend.set(self._username_key(user.username), str(user.id), self.ttl)
+
+    async def invalidate(self, user_id: int | None = None, username: str | None = None) -> None:
+        if self.backend is None:
+            return
+        keys = []
+        if user_id is not None:
+            keys.append(self._id_key(user_id))
+        if username is not None:
+            keys.append(self._username_key(username))
+        await self.backend.delete(*keys)
+
+
+def _backend_from_settings() -> CacheBackend | None:
+    if settings.USER_CACHE_BACKEND == "redis":
+        assert settings.REDIS_URL is not None
+        return RedisCacheBackend.from_url(settings.REDIS_URL)
+    if settings.USER_CACHE_BACKEND == "memory":
+        return InMemoryCacheBackend(
+            max_size=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS
+        )
+    return None
+
+
+user_cache = UserCache(_backend_from_settings(), ttl=settings.USER_CACHE_TTL_SECONDS)
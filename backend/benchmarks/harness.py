@@ -0,0 +1,68 @@
+import asyncio
+import math
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    name: str
+    operations: int
+    concurrency: int
+    elapsed: float
+    # Seconds per operation
+    p50: float
+    p95: float
+    p99: float
+
+    @property
+    def ops_per_sec(self) -> float:
+        return self.operations / self.elapsed
+
+    def format(self) -> str:
+        return (
+            f"{self.name:<24} {self.ops_per_sec:>12,.0f} ops/sec  "
+            f"p50 {self.p50 * 1000:8.3f}ms  p95 {self.p95 * 1000:8.3f}ms  "
+            f"p99 {self.p99 * 1000:8.3f}ms  (n={self.operations}, c={self.concurrency})"
+        )
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    index = max(math.ceil(fraction * len(sorted_values)) - 1, 0)
+    return sorted_values[index]
+
+
+async def run_concurrent(
+    name: str,
+    operation: Callable[[], Awaitable[object]],
+    *,
+    operations: int,
+    concurrency: int = 1,
+) -> BenchmarkResult:
+    """Run ``operation`` ``operations`` times across ``concurrency`` tasks."""
+    latencies: list[float] = []
+    remaining = operations
+
+    async def worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            await operation()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return BenchmarkResult(
+        name=name,
+        operations=operations,
+        concurrency=concurrency,
+        elapsed=elapsed,
+        p50=percentile(latencies, 0.50),
+        p95=percentile(latencies, 0.95),
+        p99=percentile(latencies, 0.99),
+    )
@@ -0,0 +1,59 @@
+"""Measure the per-request cost of MetricsMiddleware and of rendering /metrics.
+
+    uv run python -m benchmarks.metrics_overhead
+"""
+
+import argparse
+import asyncio
+import time
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.core.metrics import MetricsMiddleware, registry
+from app.main import custom_generate_unique_id
+
+
+def build_app(instrumented: bool) -> FastAPI:
+    app = FastAPI(generate_unique_id_function=custom_generate_unique_id)
+
+    @app.get("/ping", tags=["bench"])
+    async def ping() -> dict[str, str]:
+        return {"status": "ok"}
+
+    if instrumented:
+        app.add_middleware(MetricsMiddleware)
+    return app
+
+
+async def measure(app: FastAPI, requests: int) -> float:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        for _ in range(100):
+            await client.get("/ping")
+        start = time.perf_counter()
+        for _ in range(requests):
+            await client.get("/ping")
+        return (time.perf_counter() - start) / requests
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    baseline = await measure(build_app(instrumented=False), args.requests)
+    instrumented = await measure(build_app(instrumented=True), args.requests)
+
+    start = time.perf_counter()
+    for _ in range(100):
+        registry.render()
+    render = (time.perf_counter() - start) / 100
+
+    print(f"baseline:     {baseline * 1e6:10.1f}us/request")
+    print(f"instrumented: {instrumented * 1e6:10.1f}us/request")
+    print(f"overhead:     {(instrumented - baseline) * 1e6:10.1f}us/request")
+    print(f"render:       {render * 1e6:10.1f}us/scrape")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,73 @@
+"""Profile cold import of the application and check it against a target.
+
+    uv run python -m benchmarks.startup
+    uv run python -m benchmarks.startup --module app.main --runs 5 --target-ms 1200
+
+Each run imports the module in a fresh interpreter under ``-X importtime``. The
+report shows the median total import time and the heaviest packages from the
+fastest run. The script exits non-zero when the median goes over ``--target-ms``.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+
+def import_profile(module: str) -> tuple[float, dict[str, int]]:
+    """Import ``module`` in a new interpreter, returning wall seconds and self-time per module."""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    elapsed = time.perf_counter() - start
+
+    self_us: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, _, name = line.removeprefix("import time:").split("|")
+        self_us[name.strip()] = int(own)
+    return elapsed, self_us
+
+
+def by_package(self_us: dict[str, int]) -> list[tuple[str, int]]:
+    totals: dict[str, int] = defaultdict(int)
+    for name, own in self_us.items():
+        package = name.split(".")[0]
+        # Keep our own code split by module, third-party code by top-level package
+        totals[name if package == "app" else package] += own
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--target-ms", type=float, default=1500)
+    args = parser.parse_args()
+
+    runs = [import_profile(args.module) for _ in range(args.runs)]
+    median_ms = statistics.median(elapsed for elapsed, _ in runs) * 1000
+    _, fastest = min(runs, key=lambda run: run[0])
+
+    print(f"import {args.module}: median {median_ms:.0f}ms over {args.runs} runs")
+    print(f"{'module/package':<40} {'self ms':>8}")
+    for name, own in by_package(fastest)[: args.top]:
+        print(f"{name:<40} {own / 1000:8.1f}")
+
+    if median_ms > args.target_ms:
+        print(f"FAIL: over the {args.target_ms:.0f}ms target")
+        return 1
+    print(f"OK: within the {args.target_ms:.0f}ms target")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
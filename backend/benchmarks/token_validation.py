@@ -0,0 +1,45 @@
+"""Compare validate_token throughput with and without the decoded-claims cache.
+
+    uv run python -m benchmarks.token_validation
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import timedelta
+
+from app.core.security import create_access_token, token_cache, validate_token
+
+
+async def measure(tokens: list[str], iterations: int, cached: bool) -> float:
+    token_cache.clear()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for token in tokens:
+            if not cached:
+                token_cache.clear()
+            await validate_token(token)
+    elapsed = time.perf_counter() - start
+    return iterations * len(tokens) / elapsed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tokens", type=int, default=100, help="distinct tokens in rotation")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    tokens = [
+        create_access_token(subject=i, expires_delta=timedelta(hours=1))
+        for i in range(args.tokens)
+    ]
+    uncached = await measure(tokens, args.iterations, cached=False)
+    cached = await measure(tokens, args.iterations, cached=True)
+
+    print(f"uncached: {uncached:12,.0f} ops/sec")
+    print(f"cached:   {cached:12,.0f} ops/sec")
+    print(f"speedup:  {cached / uncached:12.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,42 @@
+from datetime import timedelta
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_db, get_readonly_db
+from app.core.security import create_access_token
+from app.main import app
+from app.models import User
+
+
+@pytest.fixture
+async def client(test_db_session: AsyncSession) -> AsyncClient:
+    """Create an API client whose requests use the test database session."""
+
+    async def override_get_db():
+        yield test_db_session
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_readonly_db] = override_get_db
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+        yield c
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def superuser_headers(test_superuser: User) -> dict[str, str]:
+    """Provide auth headers for the test superuser."""
+    token = create_access_token(
+        test_superuser.id, expires_delta=timedelta(hours=1), claims={"su": True}
+    )
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def user_headers(test_user: User) -> dict[str, str]:
+    """Provide auth headers for the regular test user."""
+    token = create_access_token(
+        test_user.id, expires_delta=timedelta(hours=1), claims={"su": False}
+    )
+    return {"Authorization": f"Bearer {token}"}
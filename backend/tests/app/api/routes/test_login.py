@@ -0,0 +1,87 @@
+from datetime import timedelta
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.ratelimit import login_rate_limit_store
+from app.core.security import create_access_token, decode_token
+from app.models import User
+
+
+@pytest.fixture(autouse=True)
+def reset_login_rate_limits():
+    """Start every test with full login rate-limit buckets."""
+    login_rate_limit_store._buckets.clear()
+
+
+async def login(client: AsyncClient, username: str, password: str):
+    return await client.post(
+        "/api/v1/login/access-token", data={"username": username, "password": password}
+    )
+
+
+@pytest.mark.asyncio
+async def test_login_issues_access_and_refresh_tokens(client: AsyncClient, test_superuser: User):
+    """Test that logging in returns a short-lived access token carrying the role."""
+    response = await login(client, "superuser", "superpassword123")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["token_type"] == "bearer"
+    assert body["refresh_token"]
+    claims = decode_token(body["access_token"])
+    assert claims["sub"] == str(test_superuser.id)
+    assert claims["su"] is True
+
+    users = await client.get(
+        "/api/v1/users", headers={"Authorization": f"Bearer {body['access_token']}"}
+    )
+    assert users.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_login_wrong_password(client: AsyncClient, test_user: User):
+    """Test that bad credentials are rejected."""
+    response = await login(client, "testuser", "wrongpassword")
+
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_refresh_rotates_and_detects_reuse(client: AsyncClient, test_user: User):
+    """Test that a refresh token works once and reusing it revokes its family."""
+    first = (await login(client, "testuser", "testpassword123")).json()["refresh_token"]
+
+    response = await client.post("/api/v1/login/refresh", json={"refresh_token": first})
+    assert response.status_code == 200
+    second = response.json()["refresh_token"]
+    assert second != first
+
+    reused = await client.post("/api/v1/login/refresh", json={"refresh_token": first})
+    assert reused.status_code == 401
+
+    # The reuse revoked the token issued by the legitimate rotation too
+    revoked = await client.post("/api/v1/login/refresh", json={"refresh_token": second})
+    assert revoked.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_logout_revokes_refresh_token(client: AsyncClient, test_user: User):
+    """Test that a refresh token can't be used after logging out."""
+    refresh_token = (await login(client, "testuser", "testpassword123")).json()["refresh_token"]
+
+    response = await client.post("/api/v1/logout", json={"refresh_token": refresh_token})
+    assert response.status_code == 204
+
+    response = await client.post("/api/v1/login/refresh", json={"refresh_token": refresh_token})
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_token_without_role_claim_is_rejected(client: AsyncClient, test_superuser: User):
+    """Test that access tokens from before the role claim must be replaced."""
+    token = create_access_token(test_superuser.id, expires_delta=timedelta(hours=1))
+
+    response = await client.get("/api/v1/users", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 401
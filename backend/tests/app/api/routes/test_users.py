@@ -0,0 +1,183 @@
+import csv
+import io
+import json
+
+import pytest
+from httpx import AsyncClient
+
+from app.models import User
+
+
+@pytest.mark.asyncio
+async def test_export_users_csv(
+    client: AsyncClient, superuser_headers: dict, test_user: User, test_superuser: User
+):
+    """Test exporting users as CSV."""
+    response = await client.get("/api/v1/users/export", headers=superuser_headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["username"] for row in rows] == ["superuser", "testuser"]
+    assert set(rows[0]) == {"id", "username", "email", "first_name", "last_name", "is_superuser"}
+
+
+@pytest.mark.asyncio
+async def test_export_users_ndjson(
+    client: AsyncClient, superuser_headers: dict, test_user: User, test_superuser: User
+):
+    """Test exporting users as NDJSON."""
+    response = await client.get(
+        "/api/v1/users/export", params={"format": "ndjson"}, headers=superuser_headers
+    )
+
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines == [
+        {
+            "id": test_superuser.id,
+            "username": "superuser",
+            "email": "super@example.com",
+            "first_name": "Super",
+            "last_name": "User",
+            "is_superuser": True,
+        },
+        {
+            "id": test_user.id,
+            "username": "testuser",
+            "email": "test@example.com",
+            "first_name": "Test",
+            "last_name": "User",
+            "is_superuser": False,
+        },
+    ]
+
+
+@pytest.mark.asyncio
+async def test_export_users_requires_superuser(client: AsyncClient, user_headers: dict):
+    """Test that regular users and anonymous clients can't export users."""
+    response = await client.get("/api/v1/users/export", headers=user_headers)
+    assert response.status_code == 403
+
+    response = await client.get("/api/v1/users/export")
+    assert response.status_code == 401
+
+
+@pytest.fixture
+async def many_users(test_db_session) -> list[User]:
+    users = [
+        User(
+            username=f"{prefix}{i}",
+            email=f"{prefix}{i}@{domain}",
+            first_name="Many",
+            last_name="Users",
+            hashed_password="not-a-real-hash",
+        )
+        for i in range(5)
+        for prefix, domain in (("alpha", "a.example.com"), ("beta", "b.example.com"))
+    ]
+    test_db_session.add_all(users)
+    await test_db_session.commit()
+    return users
+
+
+@pytest.mark.asyncio
+async def test_list_users_keyset_pagination(
+    client: AsyncClient, superuser_headers: dict, many_users: list[User]
+):
+    """Test walking every page of the user listing with the cursor."""
+    usernames = []
+    params: dict = {"limit": 4}
+    pages = 0
+    while True:
+        response = await client.get("/api/v1/users", params=params, headers=superuser_headers)
+        assert response.status_code == 200
+        page = response.json()
+        usernames += [user["username"] for user in page["data"]]
+        pages += 1
+        if page["next_cursor"] is None:
+            break
+        params["after"] = page["next_cursor"]
+
+    assert pages == 3
+    assert usernames == ["superuser"] + [user.username for user in many_users]
+
+
+@pytest.mark.asyncio
+async def test_list_users_prefix_filters(
+    client: AsyncClient, superuser_headers: dict, many_users: list[User]
+):
+    """Test filtering the listing by username and email prefix, ignoring case."""
+    response = await client.get(
+        "/api/v1/users", params={"username_prefix": "BeTa"}, headers=superuser_headers
+    )
+    assert [user["username"] for user in response.json()["data"]] == [
+        f"beta{i}" for i in range(5)
+    ]
+
+    response = await client.get(
+        "/api/v1/users",
+        params={"username_prefix": "alpha", "email_prefix": "ALPHA3@"},
+        headers=superuser_headers,
+    )
+    assert [user["username"] for user in response.json()["data"]] == ["alpha3"]
+
+    response = await client.get(
+        "/api/v1/users", params={"username_prefix": "%"}, headers=superuser_headers
+    )
+    assert response.json() == {"data": [], "next_cursor": None}
+
+
+@pytest.mark.asyncio
+async def test_list_users_requires_superuser(client: AsyncClient, user_headers: dict):
+    """Test that regular users can't list users."""
+    response = await client.get("/api/v1/users", headers=user_headers)
+
+    assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_search_users(
+    client: AsyncClient, superuser_headers: dict, many_users: list[User], test_db_session
+):
+    """Test searching users by prefix and by a partial match, prefix matches first."""
+    many_users[0].last_name = "Beta"
+    await test_db_session.commit()
+    response = await client.get(
+        "/api/v1/users/search", params={"q": "BETA"}, headers=superuser_headers
+    )
+    assert response.status_code == 200
+    assert [user["username"] for user in response.json()] == ["alpha0"] + [
+        f"beta{i}" for i in range(5)
+    ]
+
+    response = await client.get(
+        "/api/v1/users/search", params={"q": "b.example", "limit": 2}, headers=superuser_headers
+    )
+    assert [user["username"] for user in response.json()] == ["beta0", "beta1"]
+
+    response = await client.get(
+        "/api/v1/users/search", params={"q": "%"}, headers=superuser_headers
+    )
+    assert response.json() == []
+
+
+@pytest.mark.asyncio
+async def test_search_users_requires_superuser(client: AsyncClient, user_headers: dict):
+    """Test that regular users can't search users."""
+    response = await client.get("/api/v1/users/search", params={"q": "a"}, headers=user_headers)
+
+    assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_server_timing_header(client: AsyncClient, superuser_headers: dict):
+    """Test that API responses report their queries in Server-Timing."""
+    response = await client.get("/api/v1/users", headers=superuser_headers)
+
+    assert response.status_code == 200
+    server_timing = response.headers["server-timing"]
+    assert server_timing.startswith("db;dur=")
+    assert "db-slowest;dur=" in server_timing
+    assert '"0 queries"' not in server_timing
+
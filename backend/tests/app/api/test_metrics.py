@@ -0,0 +1,17 @@
+import pytest
+from httpx import AsyncClient
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(client: AsyncClient, superuser_headers: dict):
+    """Test that /metrics exposes route latency, pool, and JWT metrics."""
+    await client.get("/api/v1/users", headers=superuser_headers)
+
+    response = await client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'app_http_request_duration_seconds_count{route="users-list_users"}' in response.text
+    assert "app_http_requests_in_flight 1.0" in response.text
+    assert "# TYPE app_db_pool_connections gauge" in response.text
+    assert "app_jwt_decode_seconds_count" in response.text
@@ -5,6 +5,46 @@ from app.models import User
 from app.schemas.user import UserCreate
 
 
+@pytest.fixture(autouse=True)
+def clear_missing_username_cache():
+    """Keep negative login lookups from leaking between tests."""
+    from app.crud import missing_username_cache
+
+    missing_username_cache.clear()
+    yield
+    missing_username_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def fresh_user_cache(monkeypatch: pytest.MonkeyPatch):
+    """Give each test an empty in-memory user cache."""
+    from app.core.cache import InMemoryCacheBackend
+    from app.user_cache import user_cache
+
+    monkeypatch.setattr(user_cache, "backend", InMemoryCacheBackend(max_size=1000, ttl=60))
+
+
+class FakeRedis:
+    """The slice of ``redis.asyncio.Redis`` used by RedisCacheBackend, in memory."""
+
+    def __init__(self):
+        self.data: dict[str, str] = {}
+
+    async def get(self, key: str) -> str | None:
+        return self.data.get(key)
+
+    async def set(self, key: str, value: str, px: int | None = None) -> None:
+        self.data[key] = value
+
+    async def delete(self, *keys: str) -> int:
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+
+@pytest.fixture
+def fake_redis() -> FakeRedis:
+    return FakeRedis()
+
+
 @pytest.fixture
 async def test_user(test_db_session: AsyncSession) -> User:
     """Create a test user in the database."""
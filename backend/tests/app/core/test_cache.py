@@ -0,0 +1,89 @@
+import time
+
+import pytest
+
+from app.core.cache import InMemoryCacheBackend, RedisCacheBackend, TTLCache
+
+
+def test_get_returns_stored_value():
+    """Test that a stored value is returned until it expires."""
+    cache: TTLCache[str, int] = TTLCache(max_size=10, ttl=60)
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.get("missing") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_entries_expire(monkeypatch: pytest.MonkeyPatch):
+    """Test that entries are dropped once their TTL has passed."""
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    cache: TTLCache[str, int] = TTLCache(max_size=10, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=5)
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 10)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 61)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_per_entry_ttl_is_capped():
+    """Test that a per-entry TTL can't outlive the cache TTL."""
+    cache: TTLCache[str, int] = TTLCache(max_size=10, ttl=0)
+    cache.set("a", 1, ttl=3600)
+
+    assert cache.get("a") is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    """Test LRU eviction once max_size is reached."""
+    cache: TTLCache[str, int] = TTLCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_discard_where():
+    """Test removing every entry matching a predicate."""
+    cache: TTLCache[str, int] = TTLCache(max_size=10, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 1)
+
+    assert cache.discard_where(lambda value: value == 1) == 2
+    assert cache.get("b") == 2
+    assert len(cache) == 1
+
+
+@pytest.mark.asyncio
+async def test_in_memory_backend_roundtrip():
+    """Test storing, reading and deleting through the in-memory backend."""
+    backend = InMemoryCacheBackend(max_size=10, ttl=60)
+    await backend.set("a", "1", ttl=30)
+    await backend.set("b", "2", ttl=30)
+
+    assert await backend.get("a") == "1"
+    await backend.delete("a", "missing")
+    assert await backend.get("a") is None
+    assert await backend.get("b") == "2"
+
+
+@pytest.mark.asyncio
+async def test_redis_backend_roundtrip(fake_redis):
+    """Test that the Redis backend stores entries with a millisecond expiry."""
+    backend = RedisCacheBackend(fake_redis)
+    await backend.set("a", "1", ttl=1.5)
+
+    assert await backend.get("a") == "1"
+    await backend.delete("a")
+    assert await backend.get("a") is None
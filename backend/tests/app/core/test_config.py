@@ -0,0 +1,25 @@
+import pytest
+
+from app.core.config import Settings
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        ("replica1, replica2:5433,", ["replica1", "replica2:5433"]),
+        ("replica1", ["replica1"]),
+        ("", []),
+    ],
+)
+def test_replica_servers_from_comma_list(
+    monkeypatch: pytest.MonkeyPatch, value: str, expected: list[str]
+):
+    """Test that POSTGRES_REPLICA_SERVERS is read as a comma-separated list."""
+    monkeypatch.setenv("POSTGRES_REPLICA_SERVERS", value)
+
+    settings = Settings()
+
+    assert settings.POSTGRES_REPLICA_SERVERS == expected
+    assert [uri.hosts()[0]["host"] for uri in settings.SQLALCHEMY_REPLICA_URIS] == [
+        server.partition(":")[0] for server in expected
+    ]
@@ -0,0 +1,143 @@
+import pytest
+from sqlalchemy import text
+
+from app.core.db import DatabaseSessionManager
+
+
+@pytest.fixture
+async def pooled_session_manager():
+    manager = DatabaseSessionManager(
+        "sqlite+aiosqlite:///:memory:", {"pool_size": 2, "max_overflow": 1}
+    )
+    yield manager
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_pool_stats_track_checkouts(pooled_session_manager: DatabaseSessionManager):
+    """Test that pool stats report checked-out connections and checkout waits."""
+    async with pooled_session_manager.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+        stats = pooled_session_manager.pool_stats()
+        assert stats is not None
+        assert stats.size == 2
+        assert stats.checked_out == 1
+
+    stats = pooled_session_manager.pool_stats()
+    assert stats is not None
+    assert stats.checked_out == 0
+    assert stats.checked_in == 1
+    assert stats.checkout_wait is not None
+    assert stats.checkout_wait.count == 1
+
+
+@pytest.mark.asyncio
+async def test_pool_stats_without_queue_pool(db_session_manager: DatabaseSessionManager):
+    """Test that pools without a queue report no stats."""
+    assert db_session_manager.pool_stats() is None
+
+
+@pytest.mark.asyncio
+async def test_warmup_opens_and_primes_connections(
+    pooled_session_manager: DatabaseSessionManager,
+):
+    """Test that warmup fills the pool up to its size and primes each connection."""
+    primed = 0
+
+    async def prime(session):
+        nonlocal primed
+        await session.execute(text("SELECT 1"))
+        primed += 1
+
+    warmed = await pooled_session_manager.warmup(5, prime=prime)
+
+    assert warmed == 2
+    assert primed == 2
+    stats = pooled_session_manager.pool_stats()
+    assert stats is not None
+    assert stats.checked_in == 2
+    assert stats.checked_out == 0
+
+
+@pytest.mark.asyncio
+async def test_warmup_failures_are_not_raised(pooled_session_manager: DatabaseSessionManager):
+    """Test that a failing warmup doesn't prevent startup."""
+
+    async def prime(session):
+        raise RuntimeError("database unavailable")
+
+    assert await pooled_session_manager.warmup(2, prime=prime) == 0
+
+
+async def database_file(session) -> str:
+    result = await session.execute(text("PRAGMA database_list"))
+    return result.one()[2]
+
+
+@pytest.fixture
+async def replicated_session_manager(tmp_path):
+    manager = DatabaseSessionManager(
+        f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}",
+        replica_hosts=[
+            f"sqlite+aiosqlite:///{tmp_path / 'replica1.db'}",
+            f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'replica2.db'}",
+            f"sqlite+aiosqlite:///{tmp_path / 'replica3.db'}",
+        ],
+    )
+    yield manager
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_readonly_sessions_round_robin_over_healthy_replicas(
+    replicated_session_manager: DatabaseSessionManager,
+):
+    """Test that read-only sessions rotate over replicas and skip failing ones."""
+    used = []
+    for _ in range(4):
+        async with replicated_session_manager.session(readonly=True) as session:
+            used.append(await database_file(session))
+
+    assert [path.rsplit("/", 1)[1] for path in used] == [
+        "replica1.db",
+        "replica3.db",
+        "replica3.db",
+        "replica1.db",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_write_sessions_use_primary(replicated_session_manager: DatabaseSessionManager):
+    """Test that sessions default to the primary."""
+    async with replicated_session_manager.session() as session:
+        assert (await database_file(session)).endswith("primary.db")
+
+
+@pytest.mark.asyncio
+async def test_readonly_sessions_fall_back_to_primary(tmp_path):
+    """Test that read-only sessions use the primary when every replica is down."""
+    manager = DatabaseSessionManager(
+        f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}",
+        replica_hosts=[f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'replica.db'}"],
+    )
+    try:
+        async with manager.session(readonly=True) as session:
+            assert (await database_file(session)).endswith("primary.db")
+    finally:
+        await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_engine_is_created_on_first_use():
+    """Test that the manager creates no engine until it is used."""
+    manager = DatabaseSessionManager("sqlite+aiosqlite:///:memory:")
+    assert not manager.started
+    assert manager.pool_stats() is None
+
+    async with manager.session() as session:
+        await session.execute(text("SELECT 1"))
+    assert manager.started
+    assert manager.sessionmaker.kw["bind"] is manager.engine
+
+    await manager.close()
+    assert not manager.started
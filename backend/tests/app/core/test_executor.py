@@ -0,0 +1,59 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core.executor import BoundedExecutor
+
+
+@pytest.mark.asyncio
+async def test_run_returns_result():
+    """Test that calls run on the pool and return their result."""
+    executor = BoundedExecutor(2)
+    try:
+        assert await executor.run(pow, 2, 10) == 1024
+    finally:
+        executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_run_off_event_loop_thread():
+    """Test that calls don't run on the event loop thread."""
+    executor = BoundedExecutor(1)
+    try:
+        thread_id = await executor.run(threading.get_ident)
+    finally:
+        executor.shutdown()
+
+    assert thread_id != threading.get_ident()
+
+
+@pytest.mark.asyncio
+async def test_stats_track_queue_depth():
+    """Test that calls beyond max_workers are reported as queued."""
+    executor = BoundedExecutor(1)
+    release = threading.Event()
+    try:
+        tasks = [asyncio.create_task(executor.run(release.wait)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+
+        stats = executor.stats()
+        assert stats.in_flight == 3
+        assert stats.queue_depth == 2
+
+        release.set()
+        await asyncio.gather(*tasks)
+    finally:
+        executor.shutdown()
+
+    stats = executor.stats()
+    assert stats.in_flight == 0
+    assert stats.queue_depth == 0
+    assert stats.peak_queue_depth == 2
+    assert stats.submitted == stats.completed == 3
+
+
+def test_max_workers_must_be_positive():
+    """Test that an empty pool is rejected."""
+    with pytest.raises(ValueError):
+        BoundedExecutor(0)
@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.loader import BatchLoader
+from app.core.querystats import QueryBudgetExceeded, QueryStats, track_queries
+
+
+@pytest.mark.asyncio
+async def test_loads_in_the_same_tick_are_batched():
+    """Test that concurrent loads become one batch call and duplicates share it."""
+    calls: list[list[int]] = []
+
+    async def batch_fn(keys):
+        calls.append(list(keys))
+        await asyncio.sleep(0)
+        return {key: key * 10 for key in keys if key != 3}
+
+    loader: BatchLoader[int, int] = BatchLoader(batch_fn)
+    results = await asyncio.gather(*(loader.load(key) for key in [1, 2, 2, 3, 1]))
+
+    assert results == [10, 20, 20, None, 10]
+    assert calls == [[1, 2, 3]]
+
+
+@pytest.mark.asyncio
+async def test_in_flight_load_is_shared():
+    """Test that a load arriving while its key is in flight joins it."""
+    release = asyncio.Event()
+    calls = 0
+
+    async def batch_fn(keys):
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return {key: key for key in keys}
+
+    loader: BatchLoader[int, int] = BatchLoader(batch_fn)
+    first = asyncio.ensure_future(loader.load(1))
+    await asyncio.sleep(0.01)
+    second = asyncio.ensure_future(loader.load(1))
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(first, second) == [1, 1]
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_errors_reach_every_caller():
+    """Test that a failing batch raises in each waiting load, then loads retry."""
+    fail = True
+
+    async def batch_fn(keys):
+        if fail:
+            raise RuntimeError("database down")
+        return {key: key for key in keys}
+
+    loader: BatchLoader[int, int] = BatchLoader(batch_fn)
+    results = await asyncio.gather(loader.load(1), loader.load(2), return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+    fail = False
+    assert await loader.load(1) == 1
+
+
+@pytest.mark.asyncio
+async def test_batches_are_split_by_max_size():
+    """Test that large batches are split into chunks."""
+    sizes: list[int] = []
+
+    async def batch_fn(keys):
+        sizes.append(len(keys))
+        return {}
+
+    loader: BatchLoader[int, int] = BatchLoader(batch_fn, max_batch_size=2)
+    await asyncio.gather(*(loader.load(key) for key in range(5)))
+
+    assert sorted(sizes) == [1, 2, 2]
+
+
+@pytest.mark.asyncio
+async def test_batch_queries_count_for_every_waiting_caller(test_db_session: AsyncSession):
+    """Test that a shared batch's queries are tracked for each caller, not just the first."""
+
+    async def batch_fn(keys):
+        await test_db_session.execute(text("SELECT 1"))
+        return {key: key for key in keys}
+
+    loader: BatchLoader[int, int] = BatchLoader(batch_fn)
+
+    async def request(key: int) -> QueryStats:
+        with track_queries() as stats:
+            await loader.load(key)
+        return stats
+
+    first, second = await asyncio.gather(request(1), request(2))
+
+    assert (first.count, second.count) == (1, 1)
+    assert loader.batches == 1
+    assert not loader._tasks
+
+
+@pytest.mark.asyncio
+async def test_batch_queries_count_against_budget(test_db_session: AsyncSession):
+    """Test that a caller's query budget covers the batches it waited on."""
+
+    async def batch_fn(keys):
+        await test_db_session.execute(text("SELECT 1"))
+        return {key: key for key in keys}
+
+    loader: BatchLoader[int, int] = BatchLoader(batch_fn)
+
+    with pytest.raises(QueryBudgetExceeded):
+        with track_queries(budget=0, raise_on_budget=True):
+            await loader.load(1)
@@ -0,0 +1,46 @@
+import pytest
+
+from app.core.metrics import Histogram, Registry
+
+
+def test_histogram_snapshot_is_cumulative():
+    """Test that bucket counts include every observation at or below the bound."""
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 5.0):
+        histogram.observe(value)
+
+    snapshot = histogram.snapshot()
+
+    assert snapshot.buckets == ((0.1, 2), (1.0, 3), (float("inf"), 4))
+    assert snapshot.count == 4
+    assert snapshot.sum == 5.65
+
+
+def test_registry_renders_prometheus_text():
+    """Test that registered metrics render in the Prometheus text format."""
+    registry = Registry()
+    latency = registry.labelled_histogram("latency_seconds", "Latency.", "route", buckets=(0.1,))
+    in_flight = registry.gauge("in_flight", "In flight.")
+    latency.labels('users-"list"').observe(0.05)
+    in_flight.inc()
+
+    assert registry.render() == (
+        "# HELP latency_seconds Latency.\n"
+        "# TYPE latency_seconds histogram\n"
+        'latency_seconds_bucket{route="users-\\"list\\"",le="0.1"} 1\n'
+        'latency_seconds_bucket{route="users-\\"list\\"",le="+Inf"} 1\n'
+        'latency_seconds_sum{route="users-\\"list\\""} 0.05\n'
+        'latency_seconds_count{route="users-\\"list\\""} 1\n'
+        "# HELP in_flight In flight.\n"
+        "# TYPE in_flight gauge\n"
+        "in_flight 1.0\n"
+    )
+
+
+def test_registry_rejects_duplicate_names():
+    """Test that a metric name can only be registered once."""
+    registry = Registry()
+    registry.gauge("in_flight", "In flight.")
+
+    with pytest.raises(ValueError):
+        registry.gauge("in_flight", "In flight.")
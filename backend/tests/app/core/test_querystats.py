@@ -0,0 +1,30 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.querystats import QueryBudgetExceeded, track_queries
+
+
+@pytest.mark.asyncio
+async def test_track_queries_counts_statements(test_db_session: AsyncSession):
+    """Test that queries inside the block are counted and timed."""
+    with track_queries() as stats:
+        await test_db_session.execute(text("SELECT 1"))
+        await test_db_session.execute(text("SELECT 2"))
+
+    assert stats.count == 2
+    assert stats.total_seconds > 0
+    assert stats.slowest_statement in ("SELECT 1", "SELECT 2")
+
+    await test_db_session.execute(text("SELECT 3"))
+    assert stats.count == 2
+
+
+@pytest.mark.asyncio
+async def test_track_queries_raises_over_budget(test_db_session: AsyncSession):
+    """Test that exceeding the budget raises when asked to."""
+    with pytest.raises(QueryBudgetExceeded):
+        with track_queries(budget=1, raise_on_budget=True):
+            await test_db_session.execute(text("SELECT 1"))
+            await test_db_session.execute(text("SELECT 2"))
+
@@ -0,0 +1,68 @@
+import time
+
+import pytest
+
+from app.core import ratelimit
+from app.core.ratelimit import InMemoryRateLimitStore, TokenBucketLimiter
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_allows_burst_then_refills(monkeypatch: pytest.MonkeyPatch):
+    """Test that a bucket allows its burst, then one attempt per refill interval."""
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    limiter = TokenBucketLimiter(per_minute=60, burst=3, store=InMemoryRateLimitStore())
+
+    assert [await limiter.allow("key") for _ in range(4)] == [True, True, True, False]
+    assert await limiter.allow("other") is True
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 1)
+    assert await limiter.allow("key") is True
+    assert await limiter.allow("key") is False
+
+
+@pytest.mark.asyncio
+async def test_store_evicts_least_recently_used_keys():
+    """Test that the in-memory store stays bounded."""
+    store = InMemoryRateLimitStore(max_keys=2)
+    for key in ("a", "b", "c"):
+        await store.take(key, rate=0, capacity=1)
+
+    # "a" was evicted, so it starts again with a full bucket
+    assert await store.take("a", rate=0, capacity=1) is True
+    assert await store.take("c", rate=0, capacity=1) is False
+
+
+@pytest.mark.asyncio
+async def test_allow_login_attempt_limits_ip_and_username(monkeypatch: pytest.MonkeyPatch):
+    """Test that login attempts are limited per client IP and per username."""
+    store = InMemoryRateLimitStore()
+    monkeypatch.setattr(
+        ratelimit, "ip_login_limiter", TokenBucketLimiter(per_minute=0, burst=3, store=store)
+    )
+    monkeypatch.setattr(
+        ratelimit, "username_login_limiter", TokenBucketLimiter(per_minute=0, burst=2, store=store)
+    )
+
+    assert await ratelimit.allow_login_attempt("alice", "10.0.0.1") is True
+    assert await ratelimit.allow_login_attempt("ALICE", "10.0.0.1") is True
+    assert await ratelimit.allow_login_attempt("alice", "10.0.0.1") is False
+    assert await ratelimit.allow_login_attempt("bob", "10.0.0.2") is True
+    assert await ratelimit.allow_login_attempt("carol", "10.0.0.2") is True
+    assert await ratelimit.allow_login_attempt("dave", "10.0.0.2") is True
+    assert await ratelimit.allow_login_attempt("erin", "10.0.0.2") is False
+
+
+@pytest.mark.asyncio
+async def test_username_limit_does_not_lock_out_other_clients(monkeypatch: pytest.MonkeyPatch):
+    """Test that one client exhausting a username's bucket leaves other clients able to log in."""
+    store = InMemoryRateLimitStore()
+    monkeypatch.setattr(
+        ratelimit, "username_login_limiter", TokenBucketLimiter(per_minute=0, burst=2, store=store)
+    )
+
+    for _ in range(2):
+        assert await ratelimit.allow_login_attempt("admin", "203.0.113.7") is True
+    assert await ratelimit.allow_login_attempt("admin", "203.0.113.7") is False
+
+    assert await ratelimit.allow_login_attempt("admin", "10.0.0.1") is True
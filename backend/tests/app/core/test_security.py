@@ -1,11 +1,25 @@
 import pytest
 from datetime import timedelta
 
+import jwt
+
+from app.core.config import settings
 from app.core.security import (
+    ALGORITHM,
+    InvalidTokenError,
+    TokenError,
+    calibrate_bcrypt_rounds,
+    configure_password_hashing,
     create_access_token,
+    decode_token,
     get_password_hash,
+    get_password_hash_async,
+    password_hash_seconds,
     validate_token,
+    verify_and_update_password,
     verify_password,
+    verify_password_async,
+    token_cache,
 )
 
 
@@ -52,6 +66,60 @@ async def test_verify_password_incorrect():
     assert verify_password(wrong_password, hashed) is False
 
 
+@pytest.mark.asyncio
+async def test_password_hash_async_roundtrip():
+    """Test hashing and verifying on the password hash executor."""
+    password = "testpassword123"
+    hashed = await get_password_hash_async(password)
+
+    assert hashed.startswith("$2b$")
+    assert await verify_password_async(password, hashed) is True
+    assert await verify_password_async("wrongpassword", hashed) is False
+
+
+@pytest.mark.asyncio
+async def test_password_hash_async_records_bcrypt_time():
+    """Test that hashing and verifying on the executor is timed per operation."""
+    hashes = password_hash_seconds.labels("hash").count
+    verifies = password_hash_seconds.labels("verify").count
+
+    hashed = await get_password_hash_async("testpassword123")
+    await verify_password_async("testpassword123", hashed)
+
+    assert password_hash_seconds.labels("hash").count == hashes + 1
+    assert password_hash_seconds.labels("verify").count == verifies + 1
+
+
+@pytest.fixture
+def low_cost_hashing():
+    """Hash with the minimum bcrypt cost for the duration of a test."""
+    configure_password_hashing(4)
+    yield
+    configure_password_hashing(settings.PASSWORD_HASH_ROUNDS)
+
+
+@pytest.mark.asyncio
+async def test_verify_and_update_password_rehashes_lower_cost(low_cost_hashing):
+    """Test that only a hash below the configured cost comes back rehashed."""
+    old_hash = get_password_hash("testpassword123")
+    configure_password_hashing(5)
+
+    verified, new_hash = verify_and_update_password("testpassword123", old_hash)
+    assert verified is True
+    assert new_hash is not None
+    assert new_hash.startswith("$2b$05$")
+
+    configure_password_hashing(4)
+    assert verify_and_update_password("testpassword123", new_hash) == (True, None)
+    assert verify_and_update_password("wrongpassword", old_hash) == (False, None)
+
+
+def test_calibrate_bcrypt_rounds():
+    """Test that calibration stays within bounds and grows with the target."""
+    assert calibrate_bcrypt_rounds(0, min_rounds=4, max_rounds=8) == 4
+    assert calibrate_bcrypt_rounds(10_000, min_rounds=4, max_rounds=8) == 8
+
+
 @pytest.mark.asyncio
 async def test_create_access_token():
     """Test creating an access token."""
@@ -146,3 +214,59 @@ async def test_token_roundtrip():
 
     assert validated_subject == subject
 
+
+
+@pytest.mark.asyncio
+async def test_decode_token_caches_claims(monkeypatch: pytest.MonkeyPatch):
+    """Test that a valid token is only decoded once."""
+    token_cache.clear()
+    token = create_access_token(subject="123", expires_delta=timedelta(hours=1))
+    calls = 0
+    original_decode = jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        nonlocal calls
+        calls += 1
+        return original_decode(*args, **kwargs)
+
+    monkeypatch.setattr(jwt, "decode", counting_decode)
+
+    assert decode_token(token)["sub"] == "123"
+    assert decode_token(token)["sub"] == "123"
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_decode_token_cache_checks_whole_token():
+    """Test that a token reusing a cached signature is not trusted."""
+    token = create_access_token(subject="123", expires_delta=timedelta(hours=1))
+    decode_token(token)
+    header, _, signature = token.split(".")
+    other = create_access_token(subject="456", expires_delta=timedelta(hours=1))
+    forged = f"{header}.{other.split('.')[1]}.{signature}"
+
+    with pytest.raises(InvalidTokenError) as exc_info:
+        decode_token(forged)
+
+    assert exc_info.value.reason == TokenError.INVALID_SIGNATURE
+    assert token_cache.get(signature) is not None
+
+
+@pytest.mark.asyncio
+async def test_decode_token_failure_reasons():
+    """Test that decode failures report why the token was rejected."""
+    expired = create_access_token(subject="123", expires_delta=timedelta(hours=-1))
+    foreign = create_access_token(subject="123", expires_delta=timedelta(hours=1))
+    foreign = jwt.encode(jwt.decode(foreign, options={"verify_signature": False}), "other-key")
+    no_subject = jwt.encode({"exp": 9999999999}, settings.SECRET_KEY, algorithm=ALGORITHM)
+
+    cases = {
+        expired: TokenError.EXPIRED,
+        foreign: TokenError.INVALID_SIGNATURE,
+        "not-a-token": TokenError.MALFORMED,
+        no_subject: TokenError.MISSING_CLAIM,
+    }
+    for token, reason in cases.items():
+        with pytest.raises(InvalidTokenError) as exc_info:
+            decode_token(token)
+        assert exc_info.value.reason == reason
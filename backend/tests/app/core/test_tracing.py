@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.config import settings
+from app.core.tracing import TransactionSampler, span
+
+
+def transaction(duration_ms: float, status: str = "ok", status_code: int = 200) -> dict:
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return {
+        "type": "transaction",
+        "start_timestamp": start,
+        "timestamp": start + timedelta(milliseconds=duration_ms),
+        "contexts": {"trace": {"status": status}, "response": {"status_code": status_code}},
+    }
+
+
+def test_sampler_keeps_slow_and_failed_transactions():
+    """Test that slow or failed transactions survive a zero sample rate."""
+    sampler = TransactionSampler(0.0, slow_transaction_ms=500)
+
+    assert sampler.traces_sampler({}) == 1.0
+    assert sampler.before_send_transaction(transaction(20), {}) is None
+    assert sampler.before_send_transaction(transaction(800), {}) is not None
+    assert sampler.before_send_transaction(transaction(20, "internal_error", 500), {}) is not None
+
+
+def test_sampler_head_samples_by_default():
+    """Test that without the slow threshold opt-in the sample rate is applied up front."""
+    sampler = TransactionSampler(0.25, settings.SENTRY_SLOW_TRANSACTION_MS)
+
+    assert sampler.traces_sampler({}) == 0.25
+    assert sampler.traces_sampler({"parent_sampled": True}) == 1.0
+    assert sampler.traces_sampler({"asgi_scope": {"path": "/metrics"}}) == 0.0
+    assert sampler.before_send_transaction(transaction(20), {}) is not None
+
+
+def test_span_without_sentry_is_a_no_op():
+    """Test that spans outside a Sentry transaction just run the block."""
+    with pytest.raises(RuntimeError, match="inside span"):
+        with span("test.op"):
+            raise RuntimeError("inside span")
@@ -0,0 +1,105 @@
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+
+import app.admin
+from app.admin import AdminAuth, UserAdmin, admin_session_cache
+from app.core.db import DatabaseSessionManager
+from app.core.security import create_access_token
+from app.crud import create_user
+from app.schemas.user import SuperUserCreate
+from app.user_cache import user_cache
+
+
+@pytest.fixture
+def admin_auth(db_session_manager: DatabaseSessionManager, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(app.admin, "sessionmanager", db_session_manager)
+    admin_session_cache.clear()
+    yield AdminAuth(secret_key="test")
+    admin_session_cache.clear()
+
+
+@pytest.fixture
+async def admin_user(db_session_manager: DatabaseSessionManager):
+    async with db_session_manager.session() as session:
+        return await create_user(
+            session=session,
+            user_create=SuperUserCreate(
+                username="admin",
+                email="admin@example.com",
+                password="adminpass123",
+                first_name="Admin",
+                last_name="User",
+            ),
+        )
+
+
+def make_request(token: str | None) -> SimpleNamespace:
+    return SimpleNamespace(session={"token": token} if token else {})
+
+
+@pytest.mark.asyncio
+async def test_authenticate_caches_session(admin_auth: AdminAuth, admin_user, monkeypatch):
+    """Test that repeat admin requests don't query the user again."""
+    token = create_access_token(admin_user.id, expires_delta=timedelta(hours=1))
+    calls = 0
+    original = app.admin.get_current_user
+
+    async def counting_get_current_user(session, token):
+        nonlocal calls
+        calls += 1
+        return await original(session, token)
+
+    monkeypatch.setattr(app.admin, "get_current_user", counting_get_current_user)
+
+    assert await admin_auth.authenticate(make_request(token)) is True
+    assert await admin_auth.authenticate(make_request(token)) is True
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_authenticate_rejects_expired_cached_token(admin_auth: AdminAuth, admin_user):
+    """Test that a cached session is not trusted once its token is invalid."""
+    token = create_access_token(admin_user.id, expires_delta=timedelta(hours=-1))
+    admin_session_cache.set(token, app.admin.AdminSession(admin_user.id, True))
+
+    assert await admin_auth.authenticate(make_request(token)) is False
+    assert admin_session_cache.get(token) is None
+
+
+@pytest.mark.asyncio
+async def test_authenticate_without_token(admin_auth: AdminAuth):
+    """Test that requests without a session token are rejected."""
+    assert await admin_auth.authenticate(make_request(None)) is False
+
+
+@pytest.mark.asyncio
+async def test_user_edit_invalidates_sessions(admin_auth: AdminAuth, admin_user):
+    """Test that editing or deleting a user drops their cached sessions and row."""
+    token = create_access_token(admin_user.id, expires_delta=timedelta(hours=1))
+    assert await admin_auth.authenticate(make_request(token)) is True
+    assert admin_session_cache.get(token) is not None
+    assert await user_cache.backend.get(f"user:v2:id:{admin_user.id}") is not None
+
+    view = UserAdmin()
+    await view.after_model_change({}, admin_user, False, None)
+    assert admin_session_cache.get(token) is None
+    assert await user_cache.backend.get(f"user:v2:id:{admin_user.id}") is None
+
+    assert await admin_auth.authenticate(make_request(token)) is True
+    await view.after_model_delete(admin_user, None)
+    assert admin_session_cache.get(token) is None
+    assert await user_cache.backend.get(f"user:v2:id:{admin_user.id}") is None
+
+
+def test_get_admin_reuses_application_engine():
+    """Test that the admin shares the session manager's sessionmaker and pool."""
+    from fastapi import FastAPI
+
+    from app.core.db import sessionmanager
+
+    admin = app.admin.get_admin(FastAPI())
+
+    assert admin.engine is None
+    assert admin.session_maker is sessionmanager.sessionmaker
@@ -0,0 +1,36 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.admin_app import app
+
+
+@pytest.mark.asyncio
+async def test_standalone_admin_serves_login():
+    """Test that the standalone admin app serves the admin under /admin."""
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/admin/login")
+
+    assert response.status_code == 200
+    assert "<form" in response.text
+
+
+@pytest.mark.parametrize("mode", ["standalone", "disabled"])
+def test_api_without_admin_skips_sqladmin(mode: str):
+    """Test that the API app neither mounts nor imports the admin unless mounted."""
+    code = (
+        "import sys\n"
+        "from app.main import app\n"
+        "assert 'sqladmin' not in sys.modules\n"
+        "assert not any(getattr(r, 'path', '') == '/admin' for r in app.routes)\n"
+    )
+    subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).parents[2],
+        env={**os.environ, "ADMIN_MODE": mode},
+        check=True,
+    )
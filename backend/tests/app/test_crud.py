@@ -1,9 +1,27 @@
+from datetime import datetime, timedelta, timezone
+
 import pytest
+from sqlalchemy import event, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.crud import authenticate, create_user, get_current_user, get_user_by_username
+from app.core.querystats import track_queries
+from app.core.security import hash_refresh_token
+from app.crud import (
+    _prefix_upper_bound,
+    authenticate,
+    bulk_create_users,
+    create_refresh_token,
+    create_user,
+    get_current_user,
+    get_user_by_email,
+    get_user_by_username,
+    prime_user_lookups,
+    rotate_refresh_token,
+    update_user,
+)
 from app.models import User
-from app.schemas.user import UserCreate
+from app.schemas.user import UserCreate, UserUpdate
 
 
 @pytest.mark.asyncio
@@ -65,6 +83,42 @@ async def test_get_user_by_username_nonexistent(test_db_session: AsyncSession):
     assert found_user is None
 
 
+@pytest.mark.asyncio
+async def test_identity_lookups_ignore_case(test_db_session: AsyncSession, test_user: User):
+    """Test that username and email lookups and logins match regardless of case."""
+    found_user = await get_user_by_username(session=test_db_session, username="TestUser")
+    assert found_user is not None
+    assert found_user.id == test_user.id
+
+    found_user = await get_user_by_email(session=test_db_session, email="TEST@example.com")
+    assert found_user is not None
+    assert found_user.id == test_user.id
+
+    assert await authenticate(
+        session=test_db_session, username="TESTUSER", password="testpassword123"
+    )
+
+
+@pytest.mark.asyncio
+async def test_usernames_and_emails_unique_ignoring_case(
+    test_db_session: AsyncSession, test_user: User
+):
+    """Test that a username or email differing only by case can't be registered."""
+    for username, email in (("TestUser", "other@example.com"), ("other", "Test@example.com")):
+        with pytest.raises(IntegrityError):
+            await create_user(
+                session=test_db_session,
+                user_create=UserCreate(
+                    username=username,
+                    email=email,
+                    password="otherpassword123",
+                    first_name="Other",
+                    last_name="User",
+                ),
+            )
+        await test_db_session.rollback()
+
+
 @pytest.mark.asyncio
 async def test_authenticate_success(
     test_db_session: AsyncSession, test_user: User
@@ -81,6 +135,55 @@ async def test_authenticate_success(
     assert authenticated_user.username == test_user.username
 
 
+@pytest.mark.asyncio
+async def test_authenticate_rehashes_password_below_configured_cost(
+    test_db_session: AsyncSession, test_user: User
+):
+    """Test that logging in upgrades a cheaper hash without committing the caller's session."""
+    from app.core.config import settings
+    from app.core.security import configure_password_hashing, get_password_hash
+
+    configure_password_hashing(4)
+    try:
+        test_user.hashed_password = get_password_hash("testpassword123")
+    finally:
+        configure_password_hashing(settings.PASSWORD_HASH_ROUNDS)
+    await test_db_session.commit()
+    test_user.first_name = "Uncommitted"
+
+    authenticated_user = await authenticate(
+        session=test_db_session, username=test_user.username, password="testpassword123"
+    )
+
+    assert authenticated_user is not None
+    assert test_user in test_db_session.dirty
+    await test_db_session.rollback()
+    await test_db_session.refresh(test_user)
+    assert test_user.first_name == "Test"
+    assert test_user.hashed_password.startswith(f"$2b${settings.PASSWORD_HASH_ROUNDS}$")
+
+
+@pytest.mark.asyncio
+async def test_authenticate_keeps_password_above_configured_cost(
+    test_db_session: AsyncSession, test_user: User
+):
+    """Test that a hash costlier than configured isn't rewritten, so workers don't flip-flop."""
+    from app.core.config import settings
+    from app.core.security import configure_password_hashing
+
+    stored_hash = test_user.hashed_password
+    configure_password_hashing(4)
+    try:
+        assert await authenticate(
+            session=test_db_session, username=test_user.username, password="testpassword123"
+        )
+    finally:
+        configure_password_hashing(settings.PASSWORD_HASH_ROUNDS)
+
+    await test_db_session.refresh(test_user)
+    assert test_user.hashed_password == stored_hash
+
+
 @pytest.mark.asyncio
 async def test_authenticate_wrong_password(
     test_db_session: AsyncSession, test_user: User
@@ -107,6 +210,29 @@ async def test_authenticate_nonexistent_user(test_db_session: AsyncSession):
     assert authenticated_user is None
 
 
+@pytest.mark.asyncio
+async def test_authenticate_remembers_missing_usernames(
+    test_db_session: AsyncSession, user_create_data: dict
+):
+    """Test that repeat logins for a missing username skip the database until it exists."""
+    username, password = user_create_data["username"], user_create_data["password"]
+
+    with track_queries() as stats:
+        for _ in range(3):
+            user = await authenticate(
+                session=test_db_session, username=username, password=password
+            )
+            assert user is None
+    assert stats.count == 1
+
+    await create_user(session=test_db_session, user_create=UserCreate(**user_create_data))
+    with track_queries() as stats:
+        assert await authenticate(
+            session=test_db_session, username=username, password=password
+        )
+    assert stats.count == 1
+
+
 @pytest.mark.asyncio
 async def test_get_current_user_valid_token(
     test_db_session: AsyncSession, test_user: User
@@ -159,3 +285,167 @@ async def test_get_current_user_nonexistent_user(test_db_session: AsyncSession):
     current_user = await get_current_user(session=test_db_session, token=token)
 
     assert current_user is None
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_users(test_db_session: AsyncSession, test_user: User):
+    """Test bulk inserting users, skipping existing and repeated usernames/emails in any case."""
+    def user_create(username: str, email: str) -> UserCreate:
+        return UserCreate(
+            username=username,
+            email=email,
+            password="bulkpassword123",
+            first_name="Bulk",
+            last_name="User",
+        )
+
+    user_ids = await bulk_create_users(
+        session=test_db_session,
+        user_creates=[
+            user_create("bulk1", "bulk1@example.com"),
+            user_create(test_user.username.upper(), "other@example.com"),
+            user_create("bulk2", test_user.email),
+            user_create("Bulk1", "bulk3@example.com"),
+            user_create("bulk4", "BULK1@example.com"),
+            user_create("bulk5", "bulk5@example.com"),
+        ],
+    )
+
+    assert user_ids[0] is not None
+    assert user_ids[1:5] == [None, None, None, None]
+    assert user_ids[5] is not None
+
+    created = await get_user_by_username(session=test_db_session, username="bulk5")
+    assert created is not None
+    assert created.id == user_ids[5]
+    assert await authenticate(
+        session=test_db_session, username="bulk5", password="bulkpassword123"
+    )
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_users_splits_at_bind_parameter_limit(
+    test_db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+):
+    """Test that bulk inserts are split into statements within the bind-parameter limit."""
+    import app.crud
+
+    # Rows bind six parameters, is_superuser's default included, so one fits in 11
+    monkeypatch.setattr(app.crud, "MAX_BIND_PARAMETERS", 11)
+    user_creates = [
+        UserCreate(
+            username=f"split{i}",
+            email=f"split{i}@example.com",
+            password="bulkpassword123",
+            first_name="Bulk",
+            last_name="User",
+        )
+        for i in range(5)
+    ]
+    parameter_counts = []
+
+    def record_parameters(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO app_user"):
+            parameter_counts.append(len(parameters))
+
+    sync_engine = test_db_session.bind.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", record_parameters)
+    try:
+        user_ids = await bulk_create_users(session=test_db_session, user_creates=user_creates)
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", record_parameters)
+
+    assert None not in user_ids
+    assert len(set(user_ids)) == 5
+    assert parameter_counts == [6] * 5
+
+
+@pytest.mark.asyncio
+async def test_prune_refresh_tokens(test_db_session: AsyncSession, test_user: User):
+    """Test that only expired refresh tokens are pruned."""
+    from app.crud import create_refresh_token, prune_refresh_tokens, rotate_refresh_token
+    from app.models import RefreshToken
+
+    live = await create_refresh_token(session=test_db_session, user_id=test_user.id)
+    expired = await create_refresh_token(session=test_db_session, user_id=test_user.id)
+    await test_db_session.execute(
+        update(RefreshToken)
+        .where(RefreshToken.token_hash == hash_refresh_token(expired))
+        .values(expires_at=datetime.now(timezone.utc) - timedelta(minutes=1))
+    )
+    await test_db_session.commit()
+
+    assert await rotate_refresh_token(session=test_db_session, token=expired) is None
+    assert await prune_refresh_tokens(session=test_db_session) == 1
+    assert await rotate_refresh_token(session=test_db_session, token=live) is not None
+
+
+@pytest.mark.asyncio
+async def test_create_user_is_one_statement(
+    test_db_session: AsyncSession, user_create_data: dict
+):
+    """Test that creating a user issues a single INSERT ... RETURNING."""
+    user_create = UserCreate(**user_create_data)
+    with track_queries() as stats:
+        user = await create_user(session=test_db_session, user_create=user_create)
+
+    assert stats.count == 1
+    assert user.id is not None
+    assert user.is_superuser is False
+
+
+@pytest.mark.asyncio
+async def test_update_user_partial(test_db_session: AsyncSession, test_user: User):
+    """Test that only the given fields change, in a single UPDATE ... RETURNING."""
+    with track_queries() as stats:
+        user = await update_user(
+            session=test_db_session, user_id=test_user.id, user_in=UserUpdate(first_name="Renamed")
+        )
+
+    assert stats.count == 1
+    assert user is not None
+    assert user.first_name == "Renamed"
+    assert user.last_name == "User"
+
+
+@pytest.mark.asyncio
+async def test_update_user_password(test_db_session: AsyncSession, test_user: User):
+    """Test that a new password replaces the old one and revokes refresh tokens."""
+    refresh_token = await create_refresh_token(session=test_db_session, user_id=test_user.id)
+
+    await update_user(
+        session=test_db_session, user_id=test_user.id, user_in=UserUpdate(password="newpass456")
+    )
+
+    assert await authenticate(session=test_db_session, username="testuser", password="newpass456")
+    assert not await authenticate(
+        session=test_db_session, username="testuser", password="testpassword123"
+    )
+    assert await rotate_refresh_token(session=test_db_session, token=refresh_token) is None
+
+
+@pytest.mark.asyncio
+async def test_update_missing_user(test_db_session: AsyncSession):
+    """Test that updating a user that doesn't exist returns None."""
+    user = await update_user(
+        session=test_db_session, user_id=999, user_in=UserUpdate(last_name="X")
+    )
+
+    assert user is None
+
+
+def test_prefix_upper_bound():
+    """Test the range bound for prefix filters, up to the last code point."""
+    assert _prefix_upper_bound("abc") == "abd"
+    assert _prefix_upper_bound("a\U0010ffff") == "b"
+    assert _prefix_upper_bound("\ud7ff") == "\ue000"
+    assert _prefix_upper_bound("\U0010ffff\U0010ffff") is None
+
+
+@pytest.mark.asyncio
+async def test_prime_user_lookups(test_db_session: AsyncSession):
+    """Test that priming runs the login, id and username lookups."""
+    with track_queries() as stats:
+        await prime_user_lookups(test_db_session)
+
+    assert stats.count == 3
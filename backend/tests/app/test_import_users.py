@@ -0,0 +1,64 @@
+import json
+from pathlib import Path
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud import get_user_by_username
+from app.import_users import RowError, import_users, read_records
+from app.models import User
+
+
+def user_record(username: str) -> dict:
+    return {
+        "username": username,
+        "email": f"{username}@example.com",
+        "password": "importpassword123",
+        "first_name": "Import",
+        "last_name": "User",
+    }
+
+
+@pytest.mark.asyncio
+async def test_import_users_from_csv(
+    test_db_session: AsyncSession, test_user: User, tmp_path: Path
+):
+    """Test importing a CSV file in batches with per-row errors."""
+    path = tmp_path / "users.csv"
+    path.write_text(
+        "username,email,password,first_name,last_name\n"
+        "alice,alice@example.com,pw123456,Alice,A\n"
+        "bob,not-an-email,pw123456,Bob,B\n"
+        f"{test_user.username},dupe@example.com,pw123456,Test,User\n"
+        "carol,carol@example.com,pw123456,Carol,C\n"
+    )
+
+    result = await import_users(
+        session=test_db_session, records=read_records(path), batch_size=2
+    )
+
+    assert result.created == 2
+    assert [error.line for error in result.errors] == [3, 4]
+    assert result.errors[1] == RowError(4, "username or email already exists")
+    assert await get_user_by_username(session=test_db_session, username="carol")
+
+
+@pytest.mark.asyncio
+async def test_import_users_from_jsonl(test_db_session: AsyncSession, tmp_path: Path):
+    """Test importing a JSONL file, reporting unparseable lines."""
+    path = tmp_path / "users.jsonl"
+    path.write_text(
+        json.dumps(user_record("dave"))
+        + "\n{not json\n\n"
+        + json.dumps({"username": "erin"})
+        + "\n"
+        + json.dumps(user_record("frank"))
+        + "\n"
+    )
+
+    result = await import_users(session=test_db_session, records=read_records(path))
+
+    assert result.created == 2
+    assert [error.line for error in result.errors] == [2, 4]
+    assert result.errors[0].message.startswith("invalid JSON")
+    assert "email: Field required" in result.errors[1].message
@@ -0,0 +1,68 @@
+import sqlalchemy as sa
+
+from app.index_audit import (
+    IndexInfo,
+    add_scans,
+    find_redundant,
+    find_unused,
+    metadata_indexes,
+)
+from app.models import Base
+
+
+def test_models_have_no_redundant_indexes():
+    """Test that the models don't declare indexes another index already covers."""
+    assert find_redundant(metadata_indexes(Base.metadata)) == []
+
+
+def test_find_redundant_indexes():
+    """Test that duplicate and prefix-covered indexes are flagged, and nothing else."""
+    metadata = sa.MetaData()
+    sa.Table(
+        "t",
+        metadata,
+        sa.Column("id", sa.Integer, primary_key=True, index=True),
+        sa.Column("a", sa.String),
+        sa.Column("b", sa.String, unique=True),
+        sa.Index("ix_t_a", "a"),
+        sa.Index("ix_t_a_b", "a", "b"),
+        sa.Index("ix_t_a_pattern", "a", postgresql_ops={"a": "text_pattern_ops"}),
+        sa.Index("ix_t_a_lower", sa.func.lower(sa.column("a"))),
+        sa.Index("ix_t_id_covering", "id", postgresql_include=["a"]),
+    )
+
+    redundant = find_redundant(metadata_indexes(metadata))
+
+    assert sorted((index.name, covering.name) for index, covering in redundant) == [
+        ("ix_t_a", "ix_t_a_b"),
+        ("ix_t_id", "t_pkey"),
+    ]
+
+
+def test_find_unused_skips_unique_indexes():
+    """Test that only never-scanned indexes that don't enforce uniqueness are unused."""
+    indexes = [
+        IndexInfo("t", "t_pkey", ("id",), unique=True, primary=True, scans=0),
+        IndexInfo("t", "ix_t_a", ("a",), scans=0),
+        IndexInfo("t", "ix_t_b", ("b",), scans=12),
+    ]
+
+    assert [index.name for index in find_unused(indexes)] == ["ix_t_a"]
+
+
+def test_add_scans_from_replicas():
+    """Test that an index only scanned on a replica isn't reported unused."""
+    primary = [
+        IndexInfo("t", "ix_t_a", ("a",), scans=0),
+        IndexInfo("t", "ix_t_b", ("b",), scans=0),
+        IndexInfo("t", "ix_t_c", ("c",), scans=2),
+    ]
+    replicas = [
+        [IndexInfo("t", "ix_t_a", ("a",), scans=5), IndexInfo("t", "ix_t_c", ("c",), scans=1)],
+        [IndexInfo("t", "ix_t_a", ("a",), scans=1), IndexInfo("t", "ix_t_b", ("b",), scans=0)],
+    ]
+
+    indexes = add_scans(primary, replicas)
+
+    assert [index.scans for index in indexes] == [6, 0, 3]
+    assert [index.name for index in find_unused(indexes)] == ["ix_t_b"]
@@ -0,0 +1,153 @@
+import asyncio
+import json
+from datetime import timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import RedisCacheBackend
+from app.core.db import Base, DatabaseSessionManager
+from app.core.querystats import track_queries
+from app.core.security import create_access_token
+from app.crud import authenticate, get_current_user, get_user_by_username
+from app.models import User
+from app.user_cache import UserCache, user_cache, user_cache_hits
+
+
+@pytest.mark.asyncio
+async def test_username_lookup_is_cached(test_db_session: AsyncSession, test_user: User):
+    """Test that a repeated username lookup, in any case, is served without a query."""
+    await get_user_by_username(session=test_db_session, username="testuser")
+    hits = user_cache_hits.value
+
+    with track_queries() as stats:
+        user = await get_user_by_username(session=test_db_session, username="TestUser")
+
+    assert user is not None
+    assert user.id == test_user.id
+    assert stats.count == 0
+    assert user_cache_hits.value == hits + 1
+
+
+@pytest.mark.asyncio
+async def test_cached_user_can_be_updated(test_db_session: AsyncSession, test_user: User):
+    """Test that a user attached from the cache can be modified and committed."""
+    await user_cache.set(test_user)
+    test_db_session.expunge_all()
+
+    user = await user_cache.get_by_id(test_db_session, test_user.id)
+    assert user is not None
+    user.first_name = "Changed"
+    await test_db_session.commit()
+
+    test_db_session.expunge_all()
+    reloaded = await test_db_session.get(User, test_user.id)
+    assert reloaded is not None
+    assert reloaded.first_name == "Changed"
+
+
+@pytest.mark.asyncio
+async def test_password_hash_is_not_cached(test_db_session: AsyncSession, test_user: User):
+    """Test that cached users leave out the password hash, which login reads with the user."""
+    await user_cache.set(test_user)
+    data = await user_cache.backend.get(f"user:v2:id:{test_user.id}")
+    assert "hashed_password" not in json.loads(data)
+
+    test_db_session.expunge_all()
+    await get_user_by_username(session=test_db_session, username="testuser")
+    with track_queries() as stats:
+        assert await authenticate(
+            session=test_db_session, username="testuser", password="testpassword123"
+        )
+        assert not await authenticate(
+            session=test_db_session, username="testuser", password="wrong"
+        )
+    # One query per login, the hash included, whether or not the user is cached
+    assert stats.count == 2
+
+
+@pytest.mark.asyncio
+async def test_renamed_user_misses_old_username(test_db_session: AsyncSession, test_user: User):
+    """Test that a stale username entry doesn't resolve to a renamed user."""
+    await user_cache.set(test_user)
+    test_user.username = "renamed"
+    await user_cache.set(test_user)
+
+    assert await user_cache.get_by_username(test_db_session, "testuser") is None
+    assert await user_cache.get_by_username(test_db_session, "renamed") is not None
+
+
+@pytest.mark.asyncio
+async def test_redis_backend_invalidates_across_workers(
+    test_db_session: AsyncSession, test_user: User, fake_redis
+):
+    """Test that an invalidation in one process is seen by another sharing Redis."""
+    api_worker = UserCache(RedisCacheBackend(fake_redis), ttl=60)
+    admin_worker = UserCache(RedisCacheBackend(fake_redis), ttl=60)
+    await api_worker.set(test_user)
+    assert await api_worker.get_by_id(test_db_session, test_user.id) is not None
+
+    await admin_worker.invalidate(test_user.id, test_user.username)
+
+    assert await api_worker.get_by_id(test_db_session, test_user.id) is None
+    assert await api_worker.get_by_username(test_db_session, "testuser") is None
+
+
+@pytest.mark.asyncio
+async def test_concurrent_lookups_share_one_query(
+    test_db_session: AsyncSession, test_user: User, test_superuser: User
+):
+    """Test that concurrent uncached lookups collapse into one batched query."""
+    tokens = [
+        create_access_token(user.id, expires_delta=timedelta(minutes=5))
+        for user in (test_user, test_superuser, test_user, test_user)
+    ]
+
+    with track_queries() as stats:
+        users = await asyncio.gather(
+            *(get_current_user(test_db_session, token) for token in tokens),
+            get_user_by_username(session=test_db_session, username="superuser"),
+        )
+
+    assert [user.id if user else None for user in users] == [
+        test_user.id,
+        test_superuser.id,
+        test_user.id,
+        test_user.id,
+        test_superuser.id,
+    ]
+    # One query by id and one by username
+    assert stats.count == 2
+
+
+@pytest.mark.asyncio
+async def test_lookups_inside_a_transaction_use_its_connection(tmp_path):
+    """Test that a session holding the only pooled connection can still look users up."""
+    manager = DatabaseSessionManager(
+        f"sqlite+aiosqlite:///{tmp_path / 'app.db'}",
+        {"pool_size": 1, "max_overflow": 0, "pool_timeout": 1},
+    )
+    async with manager.connect() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    try:
+        async with manager.session() as session:
+            user = User(
+                username="pooled",
+                email="pooled@example.com",
+                first_name="Pooled",
+                last_name="User",
+                hashed_password="not-a-real-hash",
+            )
+            session.add(user)
+            await session.flush()
+            token = create_access_token(user.id, expires_delta=timedelta(minutes=5))
+
+            # Uncommitted, so only visible on the session's own connection
+            found = await asyncio.gather(
+                get_current_user(session, token),
+                get_user_by_username(session=session, username="POOLED"),
+            )
+
+        assert [found_user.id if found_user else None for found_user in found] == [user.id] * 2
+    finally:
+        await manager.close()
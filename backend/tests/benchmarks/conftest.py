@@ -0,0 +1,94 @@
+import json
+import os
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from app.core.db import Base, DatabaseSessionManager
+from app.crud import create_user
+from app.models import User
+from app.schemas.user import SuperUserCreate
+from benchmarks.harness import BenchmarkResult
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+RESULTS_KEY = pytest.StashKey[dict[str, BenchmarkResult]]()
+
+BENCH_USERNAME = "bench-admin"
+BENCH_PASSWORD = "benchpassword123"
+
+
+def pytest_terminal_summary(terminalreporter, config: pytest.Config) -> None:
+    results = config.stash.get(RESULTS_KEY, {})
+    if not results:
+        return
+    terminalreporter.section("benchmarks")
+    for key, result in results.items():
+        terminalreporter.write_line(f"{key.split(':')[0]:<10} {result.format()}")
+
+    if config.getoption("--benchmark-save-baseline"):
+        baseline = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+        baseline.update({key: round(result.ops_per_sec, 1) for key, result in results.items()})
+        BASELINE_PATH.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        terminalreporter.write_line(f"baseline saved to {BASELINE_PATH}")
+
+
+@pytest.fixture
+async def bench_session_manager(tmp_path: Path):
+    """Session manager on BENCHMARK_DATABASE_URL, or a throwaway SQLite file.
+
+    The tables are created and dropped around each benchmark, so only point
+    BENCHMARK_DATABASE_URL at a scratch database.
+    """
+    url = os.environ.get(
+        "BENCHMARK_DATABASE_URL", f"sqlite+aiosqlite:///{tmp_path / 'bench.db'}"
+    )
+    manager = DatabaseSessionManager(url, {"pool_size": 20, "max_overflow": 0})
+    async with manager.connect() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    yield manager
+
+    async with manager.connect() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await manager.close()
+
+
+@pytest.fixture
+async def bench_user(bench_session_manager: DatabaseSessionManager) -> User:
+    async with bench_session_manager.session() as session:
+        return await create_user(
+            session=session,
+            user_create=SuperUserCreate(
+                username=BENCH_USERNAME,
+                email="bench@example.com",
+                password=BENCH_PASSWORD,
+                first_name="Bench",
+                last_name="Admin",
+            ),
+        )
+
+
+@pytest.fixture
+def check_baseline(
+    request: pytest.FixtureRequest, bench_session_manager: DatabaseSessionManager
+) -> Callable[[BenchmarkResult], None]:
+    """Record a result and fail if it regressed past the tolerance."""
+    config = request.config
+    backend = bench_session_manager.engine.dialect.name
+    baseline = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+    tolerance = config.getoption("--benchmark-tolerance")
+
+    def check(result: BenchmarkResult) -> None:
+        key = f"{backend}:{result.name}"
+        config.stash.setdefault(RESULTS_KEY, {})[key] = result
+        expected = baseline.get(key)
+        if expected is None or config.getoption("--benchmark-save-baseline"):
+            return
+        floor = expected * (1 - tolerance)
+        assert result.ops_per_sec >= floor, (
+            f"{key} regressed: {result.ops_per_sec:,.0f} ops/sec, "
+            f"baseline {expected:,.0f} (floor {floor:,.0f})"
+        )
+
+    return check
@@ -0,0 +1,115 @@
+"""Throughput of the authentication hot path under concurrent load.
+
+Skipped by default; run with
+
+    uv run pytest tests/benchmarks --run-benchmarks [--benchmark-save-baseline]
+
+Set BENCHMARK_DATABASE_URL to a scratch Postgres database to benchmark against
+Postgres instead of SQLite.
+"""
+
+from datetime import timedelta
+
+import pytest
+
+import app.admin
+from app.admin import AdminAuth
+from app.core.db import DatabaseSessionManager
+from app.core.security import create_access_token, token_cache, validate_token
+from app.crud import authenticate, get_current_user
+from app.models import User
+from benchmarks.harness import run_concurrent
+from tests.benchmarks.conftest import BENCH_PASSWORD, BENCH_USERNAME
+
+pytestmark = pytest.mark.benchmark
+
+
+class FakeLoginRequest:
+    def __init__(self, username: str, password: str):
+        self._form = {"username": username, "password": password}
+        self.session: dict = {}
+        self.client = None
+
+    async def form(self) -> dict:
+        return self._form
+
+
+@pytest.mark.asyncio
+async def test_authenticate(
+    bench_session_manager: DatabaseSessionManager, bench_user: User, check_baseline
+):
+    async def operation():
+        async with bench_session_manager.session() as session:
+            assert await authenticate(
+                session=session, username=BENCH_USERNAME, password=BENCH_PASSWORD
+            )
+
+    check_baseline(await run_concurrent("authenticate", operation, operations=32, concurrency=8))
+
+
+@pytest.mark.asyncio
+async def test_create_access_token(check_baseline):
+    async def operation():
+        create_access_token(1, expires_delta=timedelta(minutes=15))
+
+    check_baseline(await run_concurrent("create_access_token", operation, operations=20_000))
+
+
+@pytest.mark.asyncio
+async def test_validate_token_uncached(check_baseline):
+    token = create_access_token(1, expires_delta=timedelta(minutes=15))
+
+    async def operation():
+        token_cache.clear()
+        assert await validate_token(token)
+
+    check_baseline(await run_concurrent("validate_token_uncached", operation, operations=20_000))
+
+
+@pytest.mark.asyncio
+async def test_validate_token_cached(check_baseline):
+    token = create_access_token(1, expires_delta=timedelta(minutes=15))
+
+    async def operation():
+        assert await validate_token(token)
+
+    check_baseline(await run_concurrent("validate_token_cached", operation, operations=100_000))
+
+
+@pytest.mark.asyncio
+async def test_get_current_user(
+    bench_session_manager: DatabaseSessionManager, bench_user: User, check_baseline
+):
+    token = create_access_token(bench_user.id, expires_delta=timedelta(minutes=15))
+
+    async def operation():
+        async with bench_session_manager.session(readonly=True) as session:
+            assert await get_current_user(session, token)
+
+    check_baseline(
+        await run_concurrent("get_current_user", operation, operations=2_000, concurrency=16)
+    )
+
+
+@pytest.mark.asyncio
+async def test_admin_login(
+    bench_session_manager: DatabaseSessionManager,
+    bench_user: User,
+    check_baseline,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(app.admin, "sessionmanager", bench_session_manager)
+
+    # Measure the login itself rather than the limiter shedding repeat attempts
+    async def allow_login_attempt(username, client_ip):
+        return True
+
+    monkeypatch.setattr(app.admin, "allow_login_attempt", allow_login_attempt)
+    admin_auth = AdminAuth(secret_key="bench")
+
+    async def operation():
+        assert await admin_auth.login(FakeLoginRequest(BENCH_USERNAME, BENCH_PASSWORD))
+
+    check_baseline(
+        await run_concurrent("admin_login", operation, operations=32, concurrency=8)
+    )
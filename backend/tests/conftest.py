@@ -7,6 +7,36 @@ from sqlalchemy.ext.asyncio import (
 from sqlalchemy.pool import StaticPool
 
 from app.core.db import Base, DatabaseSessionManager
+from app.core.querystats import instrument_engine
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("benchmarks")
+    group.addoption(
+        "--run-benchmarks",
+        action="store_true",
+        help="run tests marked as benchmark (skipped by default)",
+    )
+    group.addoption(
+        "--benchmark-save-baseline",
+        action="store_true",
+        help="overwrite the stored benchmark baseline with this run's results",
+    )
+    group.addoption(
+        "--benchmark-tolerance",
+        type=float,
+        default=0.3,
+        help="allowed fractional drop in ops/sec against the baseline",
+    )
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]) -> None:
+    if config.getoption("--run-benchmarks"):
+        return
+    skip = pytest.mark.skip(reason="benchmarks only run with --run-benchmarks")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
 
 
 @pytest.fixture(scope="function")
@@ -19,6 +49,7 @@ async def test_db_session() -> AsyncSession:
         poolclass=StaticPool,
         echo=False,
     )
+    instrument_engine(engine)
 
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)